@@ -0,0 +1,47 @@
+"""Add denormalized likes_count / comments_count to recipes
+
+Revision ID: 20261017_0002
+Revises: 20241014_0001
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0002"
+down_revision = "20241014_0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "recipes",
+        sa.Column("likes_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "recipes",
+        sa.Column("comments_count", sa.Integer(), server_default="0", nullable=False),
+    )
+
+    # Initialiser les compteurs à partir des données existantes
+    op.execute(
+        """
+        UPDATE recipes AS r
+        SET likes_count = COALESCE(l.n, 0),
+            comments_count = COALESCE(c.n, 0)
+        FROM recipes AS r2
+        LEFT JOIN (SELECT recipe_id, count(*) AS n FROM likes GROUP BY recipe_id) AS l
+            ON l.recipe_id = r2.id
+        LEFT JOIN (SELECT recipe_id, count(*) AS n FROM comments GROUP BY recipe_id) AS c
+            ON c.recipe_id = r2.id
+        WHERE r.id = r2.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("recipes", "comments_count")
+    op.drop_column("recipes", "likes_count")
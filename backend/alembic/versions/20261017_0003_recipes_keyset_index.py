@@ -0,0 +1,37 @@
+"""Add composite (created_at DESC, id DESC) index on recipes for keyset pagination
+
+Revision ID: 20261017_0003
+Revises: 20261017_0002
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0003"
+down_revision = "20261017_0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY : pas de verrou d'écriture sur recipes pendant la création
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_recipes_created_at_id",
+            "recipes",
+            [sa.text("created_at DESC"), sa.text("id DESC")],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_recipes_created_at_id",
+            table_name="recipes",
+            postgresql_concurrently=True,
+        )
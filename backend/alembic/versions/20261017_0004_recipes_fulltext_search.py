@@ -0,0 +1,94 @@
+"""Add maintained tsvector search document on recipes with a GIN index
+
+Revision ID: 20261017_0004
+Revises: 20261017_0003
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0004"
+down_revision = "20261017_0003"
+branch_labels = None
+depends_on = None
+
+# Recettes remplies par transaction
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    op.add_column("recipes", sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True))
+
+    # Titre (A) > tags et noms d'ingrédients (B) > description (C)
+    op.execute(
+        """
+        CREATE FUNCTION recipes_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('french', coalesce(NEW.title, '')), 'A') ||
+                setweight(to_tsvector('french', coalesce(array_to_string(NEW.tags, ' '), '')), 'B') ||
+                setweight(to_tsvector('french', coalesce((
+                    SELECT string_agg(elem->>'name', ' ')
+                    FROM json_array_elements(
+                        CASE WHEN json_typeof(NEW.ingredients) = 'array'
+                             THEN NEW.ingredients ELSE '[]'::json END
+                    ) AS elem
+                ), '')), 'B') ||
+                setweight(to_tsvector('french', coalesce(NEW.description, '')), 'C');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER recipes_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, description, ingredients, tags ON recipes
+        FOR EACH ROW EXECUTE FUNCTION recipes_search_vector_update()
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        # Remplir le document pour les recettes existantes, une transaction par lot :
+        # verrous de ligne courts, pas de réécriture de la table en une fois. Les
+        # lignes déjà remplies (écrites depuis la création du trigger) sont ignorées.
+        bind = op.get_bind()
+        last_id = 0
+        while True:
+            last_id = bind.execute(
+                sa.text(
+                    """
+                    WITH batch AS (
+                        SELECT id FROM recipes WHERE id > :last_id ORDER BY id LIMIT :batch_size
+                    ), updated AS (
+                        UPDATE recipes SET title = recipes.title
+                        FROM batch
+                        WHERE recipes.id = batch.id AND recipes.search_vector IS NULL
+                    )
+                    SELECT max(id) FROM batch
+                    """
+                ),
+                {"last_id": last_id, "batch_size": BACKFILL_BATCH_SIZE},
+            ).scalar()
+            if last_id is None:
+                break
+
+        op.create_index(
+            "ix_recipes_search_vector",
+            "recipes",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recipes_search_vector", table_name="recipes")
+    op.execute("DROP TRIGGER IF EXISTS recipes_search_vector_trigger ON recipes")
+    op.execute("DROP FUNCTION IF EXISTS recipes_search_vector_update()")
+    op.drop_column("recipes", "search_vector")
@@ -0,0 +1,51 @@
+"""Add recipe_ingredients inverted index table
+
+Revision ID: 20261017_0006
+Revises: 20261017_0005
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0006"
+down_revision = "20261017_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recipe_ingredients",
+        sa.Column("recipe_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(["recipe_id"], ["recipes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("recipe_id", "name"),
+    )
+    op.create_index(
+        "ix_recipe_ingredients_name_recipe_id",
+        "recipe_ingredients",
+        ["name", "recipe_id"],
+        unique=False,
+    )
+
+    # Remplir l'index à partir du JSON des recettes existantes
+    op.execute(
+        """
+        INSERT INTO recipe_ingredients (recipe_id, name)
+        SELECT DISTINCT r.id, lower(immutable_unaccent(btrim(elem->>'name')))
+        FROM recipes AS r
+        CROSS JOIN LATERAL json_array_elements(
+            CASE WHEN json_typeof(r.ingredients) = 'array' THEN r.ingredients ELSE '[]'::json END
+        ) AS elem
+        WHERE coalesce(btrim(elem->>'name'), '') <> ''
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recipe_ingredients_name_recipe_id", table_name="recipe_ingredients")
+    op.drop_table("recipe_ingredients")
@@ -0,0 +1,39 @@
+"""Add GIN index on recipes.tags and btree index on recipes.difficulty
+
+Revision ID: 20261017_0007
+Revises: 20261017_0006
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0007"
+down_revision = "20261017_0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_recipes_tags",
+            "recipes",
+            ["tags"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_recipes_difficulty",
+            "recipes",
+            ["difficulty"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recipes_difficulty", table_name="recipes")
+    op.drop_index("ix_recipes_tags", table_name="recipes")
@@ -0,0 +1,184 @@
+"""Convert recipes.ingredients, steps and images from JSON to JSONB with GIN indexes
+
+Revision ID: 20261017_0008
+Revises: 20261017_0007
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0008"
+down_revision = "20261017_0007"
+branch_labels = None
+depends_on = None
+
+
+def search_vector_function(json_type: str) -> str:
+    """Fonction du trigger de la migration 0004 pour le type de colonne donné (json ou jsonb)"""
+    return f"""
+        CREATE OR REPLACE FUNCTION recipes_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('french', coalesce(NEW.title, '')), 'A') ||
+                setweight(to_tsvector('french', coalesce(array_to_string(NEW.tags, ' '), '')), 'B') ||
+                setweight(to_tsvector('french', coalesce((
+                    SELECT string_agg(elem->>'name', ' ')
+                    FROM {json_type}_array_elements(
+                        CASE WHEN {json_type}_typeof(NEW.ingredients) = 'array'
+                             THEN NEW.ingredients ELSE '[]'::{json_type} END
+                    ) AS elem
+                ), '')), 'B') ||
+                setweight(to_tsvector('french', coalesce(NEW.description, '')), 'C');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """
+
+
+def recreate_search_trigger(json_type: str) -> None:
+    # Le trigger référence ingredients (UPDATE OF) : il empêche de changer ou supprimer la colonne
+    op.execute("DROP TRIGGER IF EXISTS recipes_search_vector_trigger ON recipes")
+    op.execute(search_vector_function(json_type))
+    op.execute(
+        """
+        CREATE TRIGGER recipes_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, description, ingredients, tags ON recipes
+        FOR EACH ROW EXECUTE FUNCTION recipes_search_vector_update()
+        """
+    )
+
+
+def convert_columns(json_type: str) -> None:
+    """Conversion hors ligne (ALTER ... TYPE) : réécrit la table sous verrou exclusif"""
+    # Échoue vite plutôt que de bloquer les requêtes derrière un verrou en attente
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("DROP TRIGGER IF EXISTS recipes_search_vector_trigger ON recipes")
+    # Une seule réécriture de la table pour les trois colonnes
+    op.execute(
+        f"""
+        ALTER TABLE recipes
+            ALTER COLUMN ingredients TYPE {json_type} USING ingredients::{json_type},
+            ALTER COLUMN steps TYPE {json_type} USING steps::{json_type},
+            ALTER COLUMN images TYPE {json_type} USING images::{json_type}
+        """
+    )
+    recreate_search_trigger(json_type)
+
+
+# Colonnes converties et contrainte NOT NULL d'origine
+COLUMNS = {"ingredients": True, "steps": True, "images": False}
+# Lignes recopiées par transaction pendant le remplissage
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    """Conversion en ligne : colonnes fantômes jsonb, trigger de synchronisation,
+    remplissage par lots, puis bascule dans une transaction courte (sans réécriture)."""
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    # Sans défaut : ajout sans réécriture de la table
+    op.execute(
+        "ALTER TABLE recipes "
+        + ", ".join(f"ADD COLUMN {name}_jsonb jsonb" for name in COLUMNS)
+    )
+    # Les écritures pendant la migration alimentent les colonnes fantômes
+    op.execute(
+        """
+        CREATE FUNCTION recipes_jsonb_sync() RETURNS trigger AS $$
+        BEGIN
+        """
+        + "".join(f"    NEW.{name}_jsonb := NEW.{name}::jsonb;\n" for name in COLUMNS)
+        + """
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER recipes_jsonb_sync_trigger
+        BEFORE INSERT OR UPDATE ON recipes
+        FOR EACH ROW EXECUTE FUNCTION recipes_jsonb_sync()
+        """
+    )
+    # NOT NULL préparé par une contrainte CHECK validée sans bloquer les écritures
+    for name, not_null in COLUMNS.items():
+        if not_null:
+            op.execute(
+                f"ALTER TABLE recipes ADD CONSTRAINT recipes_{name}_jsonb_not_null "
+                f"CHECK ({name}_jsonb IS NOT NULL) NOT VALID"
+            )
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        # Une transaction par lot : verrous de ligne courts, pas de verrou de table
+        last_id = 0
+        while True:
+            last_id = bind.execute(
+                sa.text(
+                    """
+                    WITH batch AS (
+                        SELECT id FROM recipes WHERE id > :last_id ORDER BY id LIMIT :batch_size
+                    ), updated AS (
+                        UPDATE recipes SET """
+                    + ", ".join(f"{name}_jsonb = {name}::jsonb" for name in COLUMNS)
+                    + """
+                        FROM batch WHERE recipes.id = batch.id
+                        RETURNING recipes.id
+                    )
+                    SELECT max(id) FROM updated
+                    """
+                ),
+                {"last_id": last_id, "batch_size": BACKFILL_BATCH_SIZE},
+            ).scalar()
+            if last_id is None:
+                break
+        # Verrou SHARE UPDATE EXCLUSIVE : lectures et écritures continuent
+        for name, not_null in COLUMNS.items():
+            if not_null:
+                op.execute(f"ALTER TABLE recipes VALIDATE CONSTRAINT recipes_{name}_jsonb_not_null")
+
+    # Bascule : uniquement des changements de catalogue, verrou exclusif bref
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute("DROP TRIGGER recipes_jsonb_sync_trigger ON recipes")
+    op.execute("DROP FUNCTION recipes_jsonb_sync()")
+    op.execute("DROP TRIGGER IF EXISTS recipes_search_vector_trigger ON recipes")
+    op.execute("ALTER TABLE recipes " + ", ".join(f"DROP COLUMN {name}" for name in COLUMNS))
+    for name in COLUMNS:
+        op.execute(f"ALTER TABLE recipes RENAME COLUMN {name}_jsonb TO {name}")
+    for name, not_null in COLUMNS.items():
+        if not_null:
+            # CHECK validé : PostgreSQL (12+) ne reparcourt pas la table
+            op.execute(f"ALTER TABLE recipes ALTER COLUMN {name} SET NOT NULL")
+            op.execute(f"ALTER TABLE recipes DROP CONSTRAINT recipes_{name}_jsonb_not_null")
+    recreate_search_trigger("jsonb")
+
+    # Requêtes de containment (@>) : ingredients @> '[{"name": "farine"}]', images @> '["x.jpg"]'
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_recipes_ingredients",
+            "recipes",
+            ["ingredients"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"ingredients": "jsonb_path_ops"},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_recipes_images",
+            "recipes",
+            ["images"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"images": "jsonb_path_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    # Retour hors ligne (réécriture de la table)
+    op.drop_index("ix_recipes_images", table_name="recipes")
+    op.drop_index("ix_recipes_ingredients", table_name="recipes")
+    convert_columns("json")
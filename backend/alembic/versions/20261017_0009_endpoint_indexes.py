@@ -0,0 +1,48 @@
+"""Add indexes on comments(recipe_id, created_at), likes(recipe_id) and recipes(owner_id)
+
+Revision ID: 20261017_0009
+Revises: 20261017_0008
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0009"
+down_revision = "20261017_0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # likes(user_id) est couvert par unique_user_recipe_like (user_id, recipe_id)
+    # et recipes(created_at) par ix_recipes_created_at_id (created_at DESC, id DESC)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_comments_recipe_id_created_at",
+            "comments",
+            ["recipe_id", "created_at"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_likes_recipe_id",
+            "likes",
+            ["recipe_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_recipes_owner_id",
+            "recipes",
+            ["owner_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recipes_owner_id", table_name="recipes")
+    op.drop_index("ix_likes_recipe_id", table_name="likes")
+    op.drop_index("ix_comments_recipe_id_created_at", table_name="comments")
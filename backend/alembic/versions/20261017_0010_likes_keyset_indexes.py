@@ -0,0 +1,49 @@
+"""Add keyset indexes on likes(recipe_id, created_at, id) and likes(user_id, created_at, id)
+
+Revision ID: 20261017_0010
+Revises: 20261017_0009
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0010"
+down_revision = "20261017_0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Pagination keyset de GET /recipes/{id}/likes et GET /users/{id}/likes
+    # (ORDER BY created_at DESC, id DESC) ; ix_likes_recipe_id devient redondant
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_likes_recipe_id_created_at",
+            "likes",
+            ["recipe_id", "created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_likes_user_id_created_at",
+            "likes",
+            ["user_id", "created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index("ix_likes_recipe_id", table_name="likes", postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_likes_recipe_id",
+            "likes",
+            ["recipe_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+    op.drop_index("ix_likes_user_id_created_at", table_name="likes")
+    op.drop_index("ix_likes_recipe_id_created_at", table_name="likes")
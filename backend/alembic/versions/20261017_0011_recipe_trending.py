@@ -0,0 +1,43 @@
+"""Add recipe_trending score table and trending_watermarks
+
+Revision ID: 20261017_0011
+Revises: 20261017_0010
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0011"
+down_revision = "20261017_0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recipe_trending",
+        sa.Column("recipe_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["recipe_id"], ["recipes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("recipe_id"),
+    )
+    op.create_index("ix_recipe_trending_score", "recipe_trending", ["score", "recipe_id"], unique=False)
+
+    op.create_table(
+        "trending_watermarks",
+        sa.Column("source", sa.Text(), nullable=False),
+        sa.Column("last_id", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("source"),
+    )
+    # Le premier passage du job intègre tout l'historique
+    op.execute("INSERT INTO trending_watermarks (source, last_id) VALUES ('likes', 0), ('comments', 0)")
+
+
+def downgrade() -> None:
+    op.drop_table("trending_watermarks")
+    op.drop_index("ix_recipe_trending_score", table_name="recipe_trending")
+    op.drop_table("recipe_trending")
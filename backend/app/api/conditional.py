@@ -0,0 +1,35 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from fastapi import Request, Response
+
+
+def make_etag(*parts) -> str:
+    """ETag fort dérivé de la version d'une ressource (pas du corps de la réponse)"""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def validator_headers(etag: str, last_modified: datetime | None = None) -> dict[str, str]:
+    """En-têtes de validation ; no-cache impose une revalidation à chaque requête"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Évalue If-None-Match (comparaison faible, RFC 9110 §13.1.2)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def not_modified(headers: dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
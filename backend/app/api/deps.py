@@ -1,27 +1,49 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from ..db.session import get_db
+from ..db.session import get_async_db, get_async_read_db, get_db
 from ..core.security import decode_token
 from ..models.user import User
+from ..services.principal_cache import Principal, principal_cache
 
 security = HTTPBearer()
 
-def get_current_user(
+def get_db_dep(db: Session = Depends(get_db)) -> Session:
+    return db
+
+async def get_async_db_dep(db: AsyncSession = Depends(get_async_db)) -> AsyncSession:
+    return db
+
+async def get_read_db_dep(db: AsyncSession = Depends(get_async_read_db)) -> AsyncSession:
+    """Session en lecture seule : réplica si configuré, sinon primaire"""
+    return db
+
+async def get_current_user(
     creds: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
+    db: AsyncSession = Depends(get_async_db_dep),
+) -> Principal:
     token = creds.credentials
     try:
         payload = decode_token(token)
         email: str = payload.get("sub")
+        user_id: int | None = payload.get("uid")
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user = db.query(User).filter(User.email == email).first()
+    cache_key = principal_cache.key(user_id, email)
+    principal = principal_cache.get(cache_key)
+    if principal is not None:
+        return principal
+
+    if user_id is not None:
+        user = await db.get(User, user_id)
+    else:
+        # Anciens tokens sans uid
+        user = (await db.execute(select(User).where(User.email == email))).scalars().first()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
-
-def get_db_dep(db: Session = Depends(get_db)) -> Session:
-    return db
+    principal = Principal.from_user(user)
+    principal_cache.set(cache_key, principal)
+    return principal
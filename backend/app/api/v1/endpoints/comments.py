@@ -1,24 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import json
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List
+from ....core.config import settings
 from ....schemas.comment import CommentCreate, CommentUpdate, CommentOut, CommentWithUser
+from ....schemas.user import UserPublic
 from ....models.comment import Comment
-from ....models.user import User
+from ....models.user import User, USER_PUBLIC_COLUMNS
 from ....models.recipe import Recipe
-from ...deps import get_current_user, get_db_dep
+from ...conditional import etag_matches, make_etag, not_modified, validator_headers
+from ...deps import get_current_user, get_async_db_dep, get_read_db_dep
+from ....services.principal_cache import Principal
+from ....services.cache import response_cache
+from ....services.comment_events import comment_broker, publish_comment_event
+from ....services.recipe_counters import increment_comments_count
 
 router = APIRouter()
 
+
+def comment_event_payload(comment: Comment, author: Principal) -> dict:
+    """Commentaire au format CommentWithUser (auteur = utilisateur courant)"""
+    return CommentWithUser(
+        **CommentOut.model_validate(comment).model_dump(),
+        user=UserPublic.model_validate(author),
+    ).model_dump(mode="json")
+
+
 @router.post("/recipes/{recipe_id}/comments", response_model=CommentOut, status_code=status.HTTP_201_CREATED)
-def create_comment(
+async def create_comment(
     recipe_id: int,
     data: CommentCreate,
-    db: Session = Depends(get_db_dep),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_dep),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Ajouter un commentaire à une recette"""
     # Vérifier que la recette existe
-    recipe = db.get(Recipe, recipe_id)
+    recipe = await db.get(Recipe, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
     
@@ -29,49 +49,126 @@ def create_comment(
         recipe_id=recipe_id
     )
     db.add(comment)
-    db.commit()
-    db.refresh(comment)
+    await db.flush()
+    await increment_comments_count(db, recipe_id, 1)
+    await db.commit()
+    await response_cache.invalidate_recipe(recipe_id)
+    await db.refresh(comment)
+    await publish_comment_event("comment_created", recipe_id, comment_event_payload(comment, current_user))
     return comment
 
 @router.get("/recipes/{recipe_id}/comments", response_model=List[CommentWithUser])
-def get_recipe_comments(
+async def get_recipe_comments(
     recipe_id: int,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db_dep)
+    db: AsyncSession = Depends(get_read_db_dep)
 ):
-    """Récupère tous les commentaires d'une recette"""
-    recipe = db.get(Recipe, recipe_id)
-    if not recipe:
+    """Récupère tous les commentaires d'une recette (ETag / If-None-Match supportés)"""
+    # Version de la collection : nombre de commentaires + dernière modification / création
+    # + dernière modification d'un profil d'auteur
+    last_updated = (
+        select(func.max(Comment.updated_at))
+        .where(Comment.recipe_id == Recipe.id)
+        .scalar_subquery()
+    )
+    last_id = (
+        select(func.max(Comment.id))
+        .where(Comment.recipe_id == Recipe.id)
+        .scalar_subquery()
+    )
+    # Les auteurs (UserPublic) font partie de la réponse : leur profil aussi
+    authors_updated = (
+        select(func.max(User.updated_at))
+        .join(Comment, Comment.user_id == User.id)
+        .where(Comment.recipe_id == Recipe.id)
+        .scalar_subquery()
+    )
+    version = (await db.execute(
+        select(
+            Recipe.comments_count,
+            last_updated.label("last_updated"),
+            last_id.label("last_id"),
+            authors_updated.label("authors_updated"),
+        )
+        .where(Recipe.id == recipe_id)
+    )).first()
+    if not version:
         raise HTTPException(status_code=404, detail="Recipe not found")
     
-    comments = (
-        db.query(Comment)
-        .filter(Comment.recipe_id == recipe_id)
+    etag = make_etag("comments", recipe_id, skip, limit, *version)
+    modified = [t for t in (version.last_updated, version.authors_updated) if t is not None]
+    headers = validator_headers(etag, max(modified) if modified else None)
+    if etag_matches(request, etag):
+        return not_modified(headers)
+    response.headers.update(headers)
+    
+    # Auteurs chargés en une seule requête (IN), limités aux colonnes de UserPublic
+    comments = (await db.execute(
+        select(Comment)
+        .where(Comment.recipe_id == recipe_id)
+        .options(selectinload(Comment.user).load_only(*USER_PUBLIC_COLUMNS))
         .order_by(Comment.created_at.desc())
         .offset(skip)
         .limit(limit)
-        .all()
-    )
+    )).scalars().all()
     return comments
 
+@router.get("/recipes/{recipe_id}/comments/stream")
+async def stream_recipe_comments(
+    recipe_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db_dep)
+):
+    """Flux SSE des commentaires d'une recette (comment_created / _updated / _deleted).
+
+    Les événements manqués (déconnexion, événement `overflow` d'un client trop
+    lent) ne sont pas rejoués : le client recharge la liste puis se reconnecte.
+    """
+    if await db.get(Recipe, recipe_id) is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    # Connexion rendue au pool : le flux peut rester ouvert longtemps
+    await db.close()
+
+    async def events():
+        with comment_broker.subscribe(recipe_id) as subscription:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await subscription.get(settings.COMMENT_STREAM_HEARTBEAT_SECONDS)
+                except OverflowError:
+                    yield "event: overflow\ndata: {}\n\n"
+                    return
+                if event is None:
+                    yield ": ping\n\n"
+                else:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event['comment'])}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/comments/{comment_id}", response_model=CommentOut)
-def get_comment(comment_id: int, db: Session = Depends(get_db_dep)):
+async def get_comment(comment_id: int, db: AsyncSession = Depends(get_read_db_dep)):
     """Récupère un commentaire spécifique"""
-    comment = db.get(Comment, comment_id)
+    comment = await db.get(Comment, comment_id)
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
     return comment
 
 @router.put("/comments/{comment_id}", response_model=CommentOut)
-def update_comment(
+async def update_comment(
     comment_id: int,
     data: CommentUpdate,
-    db: Session = Depends(get_db_dep),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_dep),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Modifier son propre commentaire"""
-    comment = db.get(Comment, comment_id)
+    comment = await db.get(Comment, comment_id)
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
     
@@ -79,31 +176,36 @@ def update_comment(
         raise HTTPException(status_code=403, detail="Not your comment")
     
     comment.content = data.content
-    db.commit()
-    db.refresh(comment)
+    await db.commit()
+    await db.refresh(comment)
+    await publish_comment_event("comment_updated", comment.recipe_id, comment_event_payload(comment, current_user))
     return comment
 
 @router.delete("/comments/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_comment(
+async def delete_comment(
     comment_id: int,
-    db: Session = Depends(get_db_dep),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_dep),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Supprimer son propre commentaire OU commentaire sur sa recette"""
-    comment = db.get(Comment, comment_id)
+    comment = await db.get(Comment, comment_id)
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
     
     # L'utilisateur peut supprimer son propre commentaire
     # OU supprimer un commentaire sur sa propre recette
-    recipe = db.get(Recipe, comment.recipe_id)
+    recipe = await db.get(Recipe, comment.recipe_id)
     if comment.user_id != current_user.id and recipe.owner_id != current_user.id:
         raise HTTPException(
             status_code=403,
             detail="You can only delete your own comments or comments on your recipes"
         )
     
-    db.delete(comment)
-    db.commit()
+    await db.delete(comment)
+    await db.flush()
+    await increment_comments_count(db, comment.recipe_id, -1)
+    await db.commit()
+    await response_cache.invalidate_recipe(recipe.id)
+    await publish_comment_event("comment_deleted", recipe.id, {"id": comment_id})
     return
 
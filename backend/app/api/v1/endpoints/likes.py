@@ -1,74 +1,231 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List
-from ....schemas.like import LikeOut, LikeWithUser
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse
+from pydantic_core import to_jsonable_python
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import and_, delete, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
+from ....schemas.like import LikedRecipeOut, LikeOut, LikeWithUser
 from ....models.like import Like
-from ....models.user import User
+from ....models.user import User, USER_PUBLIC_COLUMNS
 from ....models.recipe import Recipe
-from ...deps import get_current_user, get_db_dep
+from ...conditional import etag_matches, make_etag, not_modified, validator_headers
+from ...deps import get_current_user, get_async_db_dep, get_read_db_dep
+from ....services.principal_cache import Principal
+from ....core.config import settings
+from ....core.batch import parse_batch_ids
+from ....core.pagination import decode_cursor, encode_cursor
+from ....services.cache import response_cache
+from ....services.like_buffer import like_buffer
+from ....services.likes import add_like, remove_like
+from ....services.recipe_counters import increment_likes_count
+from ....services.recipe_reads import recipe_out_select, recipe_rows_json
 
 router = APIRouter()
 
 @router.post("/recipes/{recipe_id}/like", response_model=LikeOut, status_code=status.HTTP_201_CREATED)
-def toggle_like(
+async def toggle_like(
     recipe_id: int,
-    db: Session = Depends(get_db_dep),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_dep),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Like ou unlike une recette"""
+    """Like ou unlike une recette (préférer PUT / DELETE, idempotents)"""
     # Vérifier que la recette existe
-    recipe = db.get(Recipe, recipe_id)
+    recipe = await db.get(Recipe, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
     
+    # Écriture différée : l'état en attente du couple est appliqué avant de basculer
+    pending = await like_buffer.take(current_user.id, recipe_id) if settings.LIKE_WRITE_BEHIND else None
+    if pending is True:
+        await add_like(db, current_user.id, recipe_id)
+    elif pending is False:
+        await remove_like(db, current_user.id, recipe_id)
+    
     # Vérifier si l'utilisateur a déjà liké
-    existing_like = db.query(Like).filter(
-        and_(Like.user_id == current_user.id, Like.recipe_id == recipe_id)
-    ).first()
+    existing_like = (await db.execute(
+        select(Like).where(and_(Like.user_id == current_user.id, Like.recipe_id == recipe_id))
+    )).scalars().first()
     
     if existing_like:
-        # Unlike
-        db.delete(existing_like)
-        db.commit()
+        # Unlike (le compteur n'est décrémenté que si la ligne a bien été supprimée)
+        result = await db.execute(delete(Like).where(Like.id == existing_like.id))
+        if result.rowcount:
+            await increment_likes_count(db, recipe_id, -1)
+        await db.commit()
+        await response_cache.invalidate_recipe(recipe_id)
         raise HTTPException(status_code=204, detail="Like removed")
     
     # Like
     like = Like(user_id=current_user.id, recipe_id=recipe_id)
     db.add(like)
-    db.commit()
-    db.refresh(like)
+    await db.flush()
+    await increment_likes_count(db, recipe_id, 1)
+    await db.commit()
+    await response_cache.invalidate_recipe(recipe_id)
+    await db.refresh(like)
     return like
 
+@router.put("/recipes/{recipe_id}/like", status_code=status.HTTP_204_NO_CONTENT)
+async def like_recipe(
+    recipe_id: int,
+    db: AsyncSession = Depends(get_async_db_dep),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Like une recette (idempotent, une seule requête SQL)"""
+    if settings.LIKE_WRITE_BEHIND:
+        # Lecture par clé primaire, sans verrou sur la ligne de la recette
+        if not (await db.execute(select(Recipe.id).where(Recipe.id == recipe_id))).first():
+            raise HTTPException(status_code=404, detail="Recipe not found")
+        like_buffer.record(current_user.id, recipe_id, True)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    try:
+        created = await add_like(db, current_user.id, recipe_id)
+        await db.commit()
+    except IntegrityError as exc:
+        if getattr(exc.orig, "pgcode", None) != "23503":  # foreign_key_violation
+            raise
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    if created:
+        await response_cache.invalidate_recipe(recipe_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.delete("/recipes/{recipe_id}/like", status_code=status.HTTP_204_NO_CONTENT)
+async def unlike_recipe(
+    recipe_id: int,
+    db: AsyncSession = Depends(get_async_db_dep),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Retire le like d'une recette (idempotent, une seule requête SQL)"""
+    if settings.LIKE_WRITE_BEHIND:
+        like_buffer.record(current_user.id, recipe_id, False)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    removed = await remove_like(db, current_user.id, recipe_id)
+    await db.commit()
+    if removed:
+        await response_cache.invalidate_recipe(recipe_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.get("/recipes/likes/me")
+async def get_liked_recipe_ids(
+    ids: str = Query(..., description="Identifiants séparés par des virgules, ex: 1,2,3"),
+    db: AsyncSession = Depends(get_async_db_dep),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Parmi les recettes demandées, celles likées par l'utilisateur (une requête pour une grille)"""
+    try:
+        recipe_ids = set(parse_batch_ids(ids))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    # Index unique (user_id, recipe_id)
+    liked = set((await db.execute(
+        select(Like.recipe_id).where(Like.user_id == current_user.id, Like.recipe_id.in_(recipe_ids))
+    )).scalars())
+    # Lecture de ses propres écritures encore dans le tampon
+    for recipe_id in recipe_ids:
+        pending = like_buffer.pending_state(current_user.id, recipe_id)
+        if pending is True:
+            liked.add(recipe_id)
+        elif pending is False:
+            liked.discard(recipe_id)
+    return {"liked": sorted(liked)}
+
+def likes_keyset(query, cursor: Optional[str]):
+    """Tri (created_at DESC, id DESC) des likes, à partir du curseur s'il est fourni"""
+    query = query.order_by(Like.created_at.desc(), Like.id.desc())
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(Like.created_at, Like.id) < tuple_(cursor_created_at, cursor_id))
+    return query
+
 @router.get("/recipes/{recipe_id}/likes", response_model=List[LikeWithUser])
-def get_recipe_likes(recipe_id: int, db: Session = Depends(get_db_dep)):
-    """Récupère tous les likes d'une recette"""
-    recipe = db.get(Recipe, recipe_id)
-    if not recipe:
+async def get_recipe_likes(
+    recipe_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Curseur opaque renvoyé dans l'en-tête X-Next-Cursor"),
+    db: AsyncSession = Depends(get_read_db_dep)
+):
+    """Likes d'une recette, du plus récent au plus ancien.
+
+    Pagination par curseur (keyset sur created_at, id) : l'en-tête X-Next-Cursor
+    contient le curseur de la page suivante.
+    """
+    if not (await db.execute(select(Recipe.id).where(Recipe.id == recipe_id))).first():
         raise HTTPException(status_code=404, detail="Recipe not found")
     
-    likes = db.query(Like).filter(Like.recipe_id == recipe_id).all()
+    # Index (recipe_id, created_at, id) ; auteurs chargés en une seule requête (IN)
+    likes = (await db.execute(
+        likes_keyset(select(Like).where(Like.recipe_id == recipe_id), cursor)
+        .options(selectinload(Like.user).load_only(*USER_PUBLIC_COLUMNS))
+        .limit(limit)
+    )).scalars().all()
+    if len(likes) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(likes[-1].created_at, likes[-1].id)
     return likes
 
+@router.get("/users/{user_id}/likes", response_model=List[LikedRecipeOut])
+async def get_user_liked_recipes(
+    user_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Curseur opaque renvoyé dans l'en-tête X-Next-Cursor"),
+    db: AsyncSession = Depends(get_read_db_dep)
+):
+    """Recettes likées par un utilisateur (favoris), de la plus récemment likée à la plus ancienne"""
+    # Index (user_id, created_at, id) puis recettes par clé primaire
+    rows = (await db.execute(
+        likes_keyset(
+            recipe_out_select(Like.created_at.label("liked_at"), Like.id.label("like_id"))
+            .join(Like, Like.recipe_id == Recipe.id)
+            .where(Like.user_id == user_id),
+            cursor,
+        )
+        .limit(limit)
+    )).mappings().all()
+    if not rows and not cursor and not await db.get(User, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    items = recipe_rows_json(rows)
+    for item in items:
+        del item["like_id"]
+        item["liked_at"] = to_jsonable_python(item["liked_at"])
+    headers = None
+    if len(rows) == limit:
+        headers = {"X-Next-Cursor": encode_cursor(rows[-1]["liked_at"], rows[-1]["like_id"])}
+    return JSONResponse(content=items, headers=headers)
+
 @router.get("/recipes/{recipe_id}/likes/count")
-def get_recipe_likes_count(recipe_id: int, db: Session = Depends(get_db_dep)):
-    """Récupère le nombre de likes d'une recette"""
-    recipe = db.get(Recipe, recipe_id)
-    if not recipe:
+async def get_recipe_likes_count(recipe_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_read_db_dep)):
+    """Récupère le nombre de likes d'une recette (ETag / If-None-Match supportés)"""
+    likes_count = (await db.execute(select(Recipe.likes_count).where(Recipe.id == recipe_id))).scalar()
+    if likes_count is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
     
-    count = db.query(Like).filter(Like.recipe_id == recipe_id).count()
-    return {"recipe_id": recipe_id, "likes_count": count}
+    etag = make_etag("likes-count", recipe_id, likes_count)
+    headers = validator_headers(etag)
+    if etag_matches(request, etag):
+        return not_modified(headers)
+    response.headers.update(headers)
+    return {"recipe_id": recipe_id, "likes_count": likes_count}
 
 @router.get("/recipes/{recipe_id}/likes/me")
-def check_user_liked(
+async def check_user_liked(
     recipe_id: int,
-    db: Session = Depends(get_db_dep),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_dep),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Vérifie si l'utilisateur actuel a liké la recette"""
-    like = db.query(Like).filter(
-        and_(Like.user_id == current_user.id, Like.recipe_id == recipe_id)
-    ).first()
+    # Lecture de ses propres écritures encore dans le tampon
+    pending = like_buffer.pending_state(current_user.id, recipe_id)
+    if pending is not None:
+        return {"liked": pending}
+    like = (await db.execute(
+        select(Like.id).where(and_(Like.user_id == current_user.id, Like.recipe_id == recipe_id))
+    )).first()
     return {"liked": like is not None}
 
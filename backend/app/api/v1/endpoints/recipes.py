@@ -1,22 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+import time
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, UploadFile, File
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Float, cast, distinct, func, or_, select, text, true, tuple_
+from sqlalchemy.dialects.postgresql import REGCONFIG, array
+from sqlalchemy.exc import DBAPIError
 from typing import List, Optional
-from ....schemas.recipe import RecipeCreate, RecipeUpdate, RecipeOut
+from datetime import datetime
+from ....schemas.recipe import RecipeCreate, RecipeUpdate, RecipeOut, RecipeSuggestion, RecipeIngredientMatch, RecipeFacets, FacetCount, RecipeBatchItem, TrendingRecipeOut
 from ....models.recipe import Recipe
-from ....models.user import User
-from ....models.like import Like
-from ....models.comment import Comment
-from ...deps import get_current_user, get_db_dep
+from ....models.recipe_ingredient import RecipeIngredient
+from ....models.recipe_trending import RecipeTrending
+from ....core.config import settings
+from ....core.batch import parse_batch_ids
+from ....core.pagination import decode_cursor, encode_cursor
+from ....db.session import is_replica_session, reads_pinned_to_primary
+from ...conditional import etag_matches, make_etag, not_modified, validator_headers
+from ...deps import get_current_user, get_async_db_dep, get_read_db_dep
+from ....services.principal_cache import Principal
+from ....services.cache import response_cache
 from ....services.image_service import image_service
+from ....services.recipe_ingredients import normalized_names_select, sync_recipe_ingredients
+from ....services.recipe_reads import recipe_out_select, recipe_rows_json
+from ....services.trending import score_offset
 
 router = APIRouter()
 
-def add_recipe_counts(recipe: Recipe, db: Session) -> RecipeOut:
-    """Ajoute les compteurs de likes et comments à une recette"""
-    likes_count = db.query(func.count(Like.id)).filter(Like.recipe_id == recipe.id).scalar() or 0
-    comments_count = db.query(func.count(Comment.id)).filter(Comment.recipe_id == recipe.id).scalar() or 0
-    
+# Configuration de recherche plein texte (doit correspondre au trigger de la migration 0004)
+SEARCH_CONFIG = "french"
+
+def recipe_to_out(recipe: Recipe) -> RecipeOut:
+    """Construit un RecipeOut à partir d'une recette (compteurs dénormalisés inclus)"""
     # Convertir les ingrédients si nécessaire
     ingredients = recipe.ingredients if isinstance(recipe.ingredients, list) else []
     
@@ -36,43 +50,289 @@ def add_recipe_counts(recipe: Recipe, db: Session) -> RecipeOut:
         "images": recipe.images,
         "created_at": recipe.created_at,
         "updated_at": recipe.updated_at,
-        "likes_count": likes_count,
-        "comments_count": comments_count
+        "likes_count": recipe.likes_count or 0,
+        "comments_count": recipe.comments_count or 0
     }
     return RecipeOut(**recipe_dict)
 
-@router.get("/", response_model=List[RecipeOut])
-def list_recipes(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+def search_query(search: str):
+    """tsquery de recherche plein texte (syntaxe type moteur de recherche)"""
+    return func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), search)
+
+def filter_recipes(
+    query,
     category: Optional[str] = None,
     difficulty: Optional[str] = None,
+    tag: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db_dep)
+    search_mode: str = "contains",
 ):
-    """Liste toutes les recettes avec filtres optionnels"""
-    query = db.query(Recipe)
-    
+    """Applique les filtres de liste à un select()"""
     if category:
         query = query.filter(Recipe.category == category)
     if difficulty:
         query = query.filter(Recipe.difficulty == difficulty)
-    if search:
+    if tag:
+        # tags @> ARRAY[tag] : utilise l'index GIN ix_recipes_tags
+        query = query.filter(Recipe.tags.op("@>")(cast(array([tag]), Recipe.tags.type)))
+    if search and search_mode == "fulltext":
+        query = query.filter(Recipe.search_vector.op("@@")(search_query(search)))
+    elif search:
         query = query.filter(
             or_(
                 Recipe.title.ilike(f"%{search}%"),
                 Recipe.description.ilike(f"%{search}%")
             )
         )
+    return query
+
+def recipe_etag(recipe_id: int, updated_at: datetime, likes_count: int, comments_count: int) -> str:
+    """Version d'une recette : contenu (updated_at) et compteurs"""
+    return make_etag("recipe", recipe_id, updated_at.isoformat(), likes_count, comments_count)
+
+async def cached_response(request: Request, key: str):
+    """Entrée du cache, sauf pour un client qui vient d'écrire (lecture de ses écritures)"""
+    if reads_pinned_to_primary(request):
+        return None
+    return await response_cache.get(key)
+
+async def cache_response(db: AsyncSession, key: str, value, recipe_ids=()) -> None:
+    """Met en cache, sauf une lecture du réplica juste après une écriture (retard possible)"""
+    if is_replica_session(db) and await response_cache.in_write_window():
+        return
+    await response_cache.set(key, value, recipe_ids=recipe_ids)
+
+def recipe_list_response(payload: dict) -> JSONResponse:
+    """Réponse de liste (déjà sérialisée) avec l'en-tête de pagination"""
+    headers = {"X-Next-Cursor": payload["next_cursor"]} if payload["next_cursor"] else None
+    return JSONResponse(content=payload["items"], headers=headers)
+
+@router.get("/", response_model=List[RecipeOut])
+async def list_recipes(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    category: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    tag: Optional[str] = None,
+    search: Optional[str] = None,
+    search_mode: str = Query("contains", pattern="^(contains|fulltext)$"),
+    cursor: Optional[str] = Query(None, description="Curseur opaque renvoyé dans l'en-tête X-Next-Cursor"),
+    db: AsyncSession = Depends(get_read_db_dep)
+):
+    """Liste toutes les recettes avec filtres optionnels.
+
+    Pagination par offset (skip/limit) ou par curseur (keyset sur created_at, id) :
+    l'en-tête X-Next-Cursor contient le curseur de la page suivante.
+    Avec search_mode=fulltext, la recherche utilise l'index plein texte et les
+    résultats sont triés par pertinence (pagination par offset uniquement).
+    """
+    cache_key = await response_cache.list_key("list", {
+        "skip": skip, "limit": limit, "category": category, "difficulty": difficulty,
+        "tag": tag, "search": search, "search_mode": search_mode, "cursor": cursor,
+    })
+    cached = await cached_response(request, cache_key)
+    if cached is not None:
+        return recipe_list_response(cached)
+    
+    query = filter_recipes(recipe_out_select(), category, difficulty, tag, search, search_mode)
+    ranked = bool(search) and search_mode == "fulltext"
+    next_cursor = None
+    
+    if ranked:
+        if cursor:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not available for fulltext search")
+        query = query.order_by(
+            func.ts_rank(Recipe.search_vector, search_query(search)).desc(), Recipe.id.desc()
+        )
+        rows = (await db.execute(query.offset(skip).limit(limit))).mappings().all()
+    else:
+        query = query.order_by(Recipe.created_at.desc(), Recipe.id.desc())
+        if cursor:
+            try:
+                cursor_created_at, cursor_id = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            # Keyset : parcours de l'index (created_at DESC, id DESC) sans OFFSET
+            query = query.filter(
+                tuple_(Recipe.created_at, Recipe.id) < tuple_(cursor_created_at, cursor_id)
+            )
+        else:
+            query = query.offset(skip)
+        
+        # Les compteurs sont des colonnes de recipes : une seule requête par page
+        rows = (await db.execute(query.limit(limit))).mappings().all()
+        if len(rows) == limit:
+            last = rows[-1]
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+    
+    # Lignes Core sérialisées directement (pas d'objets ORM ni de RecipeOut intermédiaires)
+    payload = {"items": recipe_rows_json(rows), "next_cursor": next_cursor}
+    await cache_response(db, cache_key, payload, recipe_ids=[r["id"] for r in rows])
+    return recipe_list_response(payload)
+
+@router.get("/facets", response_model=RecipeFacets)
+async def recipe_facets(
+    category: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    tag: Optional[str] = None,
+    search: Optional[str] = None,
+    search_mode: str = Query("contains", pattern="^(contains|fulltext)$"),
+    db: AsyncSession = Depends(get_read_db_dep)
+):
+    """Nombre de recettes par catégorie, difficulté et tag pour les filtres courants (une seule requête)"""
+    filtered = filter_recipes(
+        select(Recipe.id, Recipe.category, Recipe.difficulty, Recipe.tags),
+        category, difficulty, tag, search, search_mode,
+    ).subquery()
+    tags = func.unnest(filtered.c.tags).table_valued("tag").render_derived().lateral()
+    rows = (await db.execute(
+        select(
+            func.grouping(filtered.c.category).label("by_category"),
+            func.grouping(filtered.c.difficulty).label("by_difficulty"),
+            func.grouping(tags.c.tag).label("by_tag"),
+            filtered.c.category,
+            filtered.c.difficulty,
+            tags.c.tag,
+            func.count(distinct(filtered.c.id)).label("count"),
+        )
+        .select_from(filtered)
+        .outerjoin(tags, true())
+        .group_by(
+            func.grouping_sets(
+                tuple_(filtered.c.category),
+                tuple_(filtered.c.difficulty),
+                tuple_(tags.c.tag),
+                tuple_(),
+            )
+        )
+        .order_by(text("count DESC"))
+    )).all()
+    
+    facets = RecipeFacets(total=0, category=[], difficulty=[], tags=[])
+    for row in rows:
+        if not row.by_category:
+            facets.category.append(FacetCount(value=row.category, count=row.count))
+        elif not row.by_difficulty:
+            facets.difficulty.append(FacetCount(value=row.difficulty, count=row.count))
+        elif not row.by_tag:
+            if row.tag is not None:
+                facets.tags.append(FacetCount(value=row.tag, count=row.count))
+        else:
+            facets.total = row.count
+    return facets
+
+@router.get("/suggest", response_model=List[RecipeSuggestion])
+async def suggest_recipes(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(8, ge=1, le=20),
+    db: AsyncSession = Depends(get_read_db_dep)
+):
+    """Suggestions de titres (typeahead) insensibles aux accents et aux fautes de frappe"""
+    # Même expression que l'index trigramme ix_recipes_title_trgm
+    title = func.lower(func.immutable_unaccent(Recipe.title))
+    term = func.lower(func.immutable_unaccent(q))
+    
+    # Borne la latence : la requête est annulée au-delà du délai configuré
+    await db.execute(select(func.set_config("statement_timeout", str(settings.SUGGEST_TIMEOUT_MS), True)))
+    try:
+        rows = (await db.execute(
+            select(Recipe.id, Recipe.title, func.word_similarity(term, title).label("score"))
+            .where(title.op("%>")(term))
+            .order_by(title.op("<->>")(term), Recipe.id)
+            .limit(limit)
+        )).all()
+    except DBAPIError as exc:
+        if getattr(exc.orig, "pgcode", None) != "57014":  # query_canceled
+            raise
+        await db.rollback()
+        return []
+    return [RecipeSuggestion(id=r.id, title=r.title, score=r.score) for r in rows]
+
+@router.get("/by-ingredients", response_model=List[RecipeIngredientMatch])
+async def recipes_by_ingredients(
+    ingredients: List[str] = Query(..., min_length=1, max_length=50),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db_dep)
+):
+    """Recettes réalisables avec les ingrédients donnés, triées par couverture"""
+    # Nombre d'ingrédients disponibles par recette candidate (index name, recipe_id)
+    matched = (
+        select(RecipeIngredient.recipe_id, func.count().label("matched"))
+        .where(RecipeIngredient.name.in_(normalized_names_select(ingredients)))
+        .group_by(RecipeIngredient.recipe_id)
+        .subquery()
+    )
+    total = (
+        select(func.count())
+        .where(RecipeIngredient.recipe_id == matched.c.recipe_id)
+        .correlate(matched)
+        .scalar_subquery()
+    )
+    coverage = cast(matched.c.matched, Float) / total
+    rows = (await db.execute(
+        recipe_out_select(
+            matched.c.matched.label("matched_ingredients"),
+            total.label("total_ingredients"),
+            coverage.label("coverage"),
+        )
+        .join(matched, matched.c.recipe_id == Recipe.id)
+        .order_by(coverage.desc(), matched.c.matched.desc(), Recipe.id.desc())
+        .limit(limit)
+    )).mappings().all()
+    return JSONResponse(content=recipe_rows_json(rows))
+
+@router.get("/trending", response_model=List[TrendingRecipeOut])
+async def trending_recipes(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db_dep)
+):
+    """Recettes tendance : likes et commentaires récents, décroissance exponentielle.
+
+    Scores maintenus par le job update-trending.py ; lecture de l'index du score.
+    """
+    cache_key = await response_cache.list_key("trending", {"limit": limit})
+    cached = await cached_response(request, cache_key)
+    if cached is not None:
+        return JSONResponse(content=cached)
     
-    recipes = query.order_by(Recipe.created_at.desc()).offset(skip).limit(limit).all()
-    return [add_recipe_counts(r, db) for r in recipes]
+    offset = score_offset(time.time())
+    rows = (await db.execute(
+        recipe_out_select(func.exp(func.greatest(RecipeTrending.score - offset, -700)).label("trending_score"))
+        .join(RecipeTrending, RecipeTrending.recipe_id == Recipe.id)
+        .order_by(RecipeTrending.score.desc(), RecipeTrending.recipe_id.desc())
+        .limit(limit)
+    )).mappings().all()
+    items = recipe_rows_json(rows)
+    await cache_response(db, cache_key, items, recipe_ids=[r["id"] for r in rows])
+    return JSONResponse(content=items)
+
+@router.get("/batch", response_model=List[RecipeBatchItem])
+async def get_recipes_batch(
+    ids: str = Query(..., description="Identifiants séparés par des virgules, ex: 1,2,3"),
+    db: AsyncSession = Depends(get_read_db_dep)
+):
+    """Récupère plusieurs recettes en une requête, dans l'ordre demandé"""
+    try:
+        recipe_ids = parse_batch_ids(ids)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    
+    rows = (await db.execute(
+        recipe_out_select().where(Recipe.id.in_(set(recipe_ids)))
+    )).mappings().all()
+    by_id = {row["id"]: row for row in recipe_rows_json(rows)}
+    return JSONResponse(content=[
+        {"id": rid, "found": rid in by_id, "recipe": by_id.get(rid)}
+        for rid in recipe_ids
+    ])
 
 @router.post("/", response_model=RecipeOut, status_code=status.HTTP_201_CREATED)
-def create_recipe(
+async def create_recipe(
     data: RecipeCreate,
-    db: Session = Depends(get_db_dep),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_dep),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Créer une nouvelle recette"""
     # Convertir les ingrédients en dict pour PostgreSQL JSON
@@ -81,27 +341,57 @@ def create_recipe(
     
     obj = Recipe(**recipe_data, owner_id=current_user.id)
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
-    return add_recipe_counts(obj, db)
+    await db.flush()
+    await sync_recipe_ingredients(db, obj.id, obj.ingredients)
+    await db.commit()
+    await response_cache.invalidate_lists()
+    await db.refresh(obj)
+    return recipe_to_out(obj)
 
 @router.get("/{recipe_id}", response_model=RecipeOut)
-def get_recipe(recipe_id: int, db: Session = Depends(get_db_dep)):
-    """Récupère une recette spécifique"""
-    obj = db.get(Recipe, recipe_id)
-    if not obj:
+async def get_recipe(recipe_id: int, request: Request, db: AsyncSession = Depends(get_read_db_dep)):
+    """Récupère une recette spécifique (ETag / If-None-Match supportés)"""
+    cache_key = response_cache.detail_key(recipe_id)
+    cached = await cached_response(request, cache_key)
+    if cached is not None:
+        headers = validator_headers(cached["etag"], datetime.fromisoformat(cached["last_modified"]))
+        if etag_matches(request, cached["etag"]):
+            return not_modified(headers)
+        return JSONResponse(content=cached["body"], headers=headers)
+    
+    # Revalidation : lecture de la seule version, sans charger ni sérialiser la recette
+    if request.headers.get("if-none-match"):
+        version = (await db.execute(
+            select(Recipe.updated_at, Recipe.likes_count, Recipe.comments_count)
+            .where(Recipe.id == recipe_id)
+        )).first()
+        if not version:
+            raise HTTPException(status_code=404, detail="Recipe not found")
+        etag = recipe_etag(recipe_id, *version)
+        if etag_matches(request, etag):
+            return not_modified(validator_headers(etag, version.updated_at))
+    
+    row = (await db.execute(recipe_out_select().where(Recipe.id == recipe_id))).mappings().first()
+    if not row:
         raise HTTPException(status_code=404, detail="Recipe not found")
-    return add_recipe_counts(obj, db)
+    etag = recipe_etag(row["id"], row["updated_at"], row["likes_count"], row["comments_count"])
+    payload = recipe_rows_json([row])[0]
+    await cache_response(db, cache_key, {
+        "body": payload,
+        "etag": etag,
+        "last_modified": row["updated_at"].isoformat(),
+    })
+    return JSONResponse(content=payload, headers=validator_headers(etag, row["updated_at"]))
 
 @router.put("/{recipe_id}", response_model=RecipeOut)
-def update_recipe(
+async def update_recipe(
     recipe_id: int,
     data: RecipeUpdate,
-    db: Session = Depends(get_db_dep),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_dep),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Modifier une recette (propriétaire uniquement)"""
-    obj = db.get(Recipe, recipe_id)
+    obj = await db.get(Recipe, recipe_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Recipe not found")
     if obj.owner_id != current_user.id:
@@ -113,19 +403,23 @@ def update_recipe(
     
     for k, v in update_data.items():
         setattr(obj, k, v)
+    if 'ingredients' in update_data:
+        await sync_recipe_ingredients(db, obj.id, obj.ingredients or [])
     
-    db.commit()
-    db.refresh(obj)
-    return add_recipe_counts(obj, db)
+    await db.commit()
+    await response_cache.invalidate_recipe(recipe_id)
+    await response_cache.invalidate_lists()
+    await db.refresh(obj)
+    return recipe_to_out(obj)
 
 @router.delete("/{recipe_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_recipe(
+async def delete_recipe(
     recipe_id: int,
-    db: Session = Depends(get_db_dep),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_dep),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Supprimer une recette (propriétaire uniquement)"""
-    obj = db.get(Recipe, recipe_id)
+    obj = await db.get(Recipe, recipe_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Recipe not found")
     if obj.owner_id != current_user.id:
@@ -140,19 +434,21 @@ def delete_recipe(
             except:
                 pass
     
-    db.delete(obj)
-    db.commit()
+    await db.delete(obj)
+    await db.commit()
+    await response_cache.invalidate_recipe(recipe_id)
+    await response_cache.invalidate_lists()
     return
 
 @router.post("/{recipe_id}/images")
 async def upload_recipe_images(
     recipe_id: int,
     images: List[UploadFile] = File(...),
-    db: Session = Depends(get_db_dep),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db_dep),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Upload des images pour une recette"""
-    recipe = db.get(Recipe, recipe_id)
+    recipe = await db.get(Recipe, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
     if recipe.owner_id != current_user.id:
@@ -165,8 +461,9 @@ async def upload_recipe_images(
     existing_images = recipe.images if recipe.images else []
     recipe.images = existing_images + image_filenames
     
-    db.commit()
-    db.refresh(recipe)
+    await db.commit()
+    await response_cache.invalidate_recipe(recipe_id)
+    await db.refresh(recipe)
     
     return {
         "message": "Images uploaded successfully",
@@ -0,0 +1,17 @@
+from typing import List
+
+# Nombre maximal d'identifiants par requête groupée (?ids=1,2,3)
+BATCH_MAX_IDS = 300
+
+
+def parse_batch_ids(ids: str) -> List[int]:
+    """Liste d'identifiants "1,2,3" ; lève ValueError si invalide, vide ou trop longue"""
+    try:
+        item_ids = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError as exc:
+        raise ValueError("ids must be a comma-separated list of integers") from exc
+    if not item_ids:
+        raise ValueError("ids must not be empty")
+    if len(item_ids) > BATCH_MAX_IDS:
+        raise ValueError(f"At most {BATCH_MAX_IDS} ids per request")
+    return item_ids
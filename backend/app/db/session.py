@@ -1,10 +1,71 @@
+import logging
+import time
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from ..core.config import settings
+from .pool import InstrumentedAsyncPool
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+logger = logging.getLogger(__name__)
+
+def pool_options() -> dict:
+    """Options de pool communes aux moteurs (voir DB_POOL_* dans la configuration)"""
+    return {
+        "pool_pre_ping": True,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+
+# Moteur synchrone (seed au démarrage, scripts) : petit pool dédié, hors budget des endpoints
+engine = create_engine(
+    settings.DATABASE_URL, **{**pool_options(), "pool_size": settings.DB_SYNC_POOL_SIZE, "max_overflow": 0}
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def async_database_url(url: str) -> str:
+    """Même base que DATABASE_URL, avec le driver asyncpg"""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+# Moteur asynchrone utilisé par les endpoints de l'API
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL), poolclass=InstrumentedAsyncPool, **pool_options()
+)
+# expire_on_commit=False : pas de rechargement implicite (lazy load) après commit
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Réplica en lecture optionnel (DATABASE_REPLICA_URL)
+replica_engine = create_async_engine(
+    async_database_url(settings.DATABASE_REPLICA_URL),
+    poolclass=InstrumentedAsyncPool,
+    connect_args={"timeout": settings.REPLICA_CONNECT_TIMEOUT_SECONDS},
+    **pool_options(),
+) if settings.DATABASE_REPLICA_URL else None
+ReplicaSessionLocal = async_sessionmaker(
+    replica_engine, autoflush=False, expire_on_commit=False
+) if replica_engine else None
+
+# Cookie posé après une écriture : les lectures suivantes du client restent sur le primaire
+PRIMARY_READS_COOKIE = "read_primary"
+
+class ReplicaHealth:
+    """Écarte le réplica pendant REPLICA_RETRY_SECONDS après un échec de connexion"""
+
+    def __init__(self):
+        self.down_until = 0.0
+
+    def available(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def mark_down(self) -> None:
+        self.down_until = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+replica_health = ReplicaHealth()
+
 class Base(DeclarativeBase):
     pass
 
@@ -15,3 +76,41 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def reads_pinned_to_primary(request: Request) -> bool:
+    """Client qui vient d'écrire (cookie read_primary) : lectures sur le primaire"""
+    return bool(request.cookies.get(PRIMARY_READS_COOKIE))
+
+def is_replica_session(db: AsyncSession) -> bool:
+    return replica_engine is not None and db.bind is replica_engine
+
+async def open_read_session(request: Request) -> AsyncSession:
+    """Session sur le réplica si disponible, sinon sur le primaire"""
+    if (
+        ReplicaSessionLocal is None
+        or reads_pinned_to_primary(request)
+        or not replica_health.available()
+    ):
+        return AsyncSessionLocal()
+    db = ReplicaSessionLocal()
+    try:
+        # Connexion immédiate : un réplica injoignable bascule la requête sur le primaire
+        await db.connection()
+    except (DBAPIError, OSError) as exc:
+        await db.close()
+        replica_health.mark_down()
+        logger.warning("Read replica unavailable, falling back to primary: %s", exc)
+        return AsyncSessionLocal()
+    return db
+
+async def get_async_read_db(request: Request):
+    """Dependency des endpoints en lecture seule (routage vers le réplica)"""
+    db = await open_read_session(request)
+    try:
+        yield db
+    finally:
+        await db.close()
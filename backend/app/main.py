@@ -3,10 +3,12 @@ import time
 from datetime import datetime
 from pathlib import Path
 
+import anyio.to_thread
 from alembic import command
 from alembic.config import Config
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy import create_engine, inspect
 from sqlalchemy.exc import SQLAlchemyError
@@ -14,8 +16,13 @@ from sqlalchemy.exc import SQLAlchemyError
 from .api.v1.router import api_router
 from .core.config import settings
 from .core.security import get_password_hash
-from .db.session import SessionLocal
+from .db.pool import pool_status
+from .db.session import PRIMARY_READS_COOKIE, SessionLocal, async_engine, engine, replica_engine, replica_health
 from .models.user import User
+from .services.cache import response_cache
+from .services.comment_events import comment_broker
+from .services.like_buffer import like_buffer
+from .services.password_hasher import PasswordHasherBusy, password_hasher
 
 logger = logging.getLogger(__name__)
 
@@ -43,14 +50,64 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+@app.middleware("http")
+async def pin_reads_to_primary_after_write(request: Request, call_next):
+    """Après une écriture, le client lit sur le primaire (lecture de ses propres écritures)"""
+    response = await call_next(request)
+    if (
+        replica_engine is not None
+        and request.method not in ("GET", "HEAD", "OPTIONS")
+        and response.status_code < 400
+    ):
+        response.set_cookie(
+            PRIMARY_READS_COOKIE, "1",
+            max_age=settings.REPLICA_STICKY_SECONDS, httponly=True, samesite="lax",
+        )
+    return response
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy(request: Request, exc: PasswordHasherBusy):
+    """Rafale de connexions : refus immédiat plutôt qu'une file d'attente sans fin"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many authentication requests, retry later"},
+        headers={"Retry-After": "1"},
+    )
+
 @app.on_event("startup")
 def on_startup():
     run_database_migrations()
     seed_default_user()
 
 
+@app.on_event("startup")
+def configure_threadpool():
+    # Pas plus de threads (handlers/dépendances synchrones) que de connexions disponibles
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+
+
+@app.on_event("startup")
+async def start_background_services():
+    """Pool bcrypt, tampon des likes et écoute des événements de commentaires"""
+    password_hasher.start()
+    if settings.LIKE_WRITE_BEHIND:
+        like_buffer.start()
+    await comment_broker.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    password_hasher.shutdown()
+    await like_buffer.stop()
+    await comment_broker.stop()
+    await async_engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+
+
 def run_database_migrations() -> None:
     cfg_path = Path(__file__).resolve().parent.parent / "alembic.ini"
     if not cfg_path.exists():
@@ -58,9 +115,9 @@ def run_database_migrations() -> None:
         return
 
     existing_tables = _get_existing_table_names()
-    if existing_tables:
+    if existing_tables and "alembic_version" not in existing_tables:
         logger.info(
-            "Existing database tables detected (%s). Skipping Alembic migrations.",
+            "Existing database tables detected without Alembic history (%s). Skipping Alembic migrations.",
             ", ".join(sorted(existing_tables)),
         )
         return
@@ -171,6 +228,39 @@ def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/metrics/cache")
+def cache_metrics():
+    """Statistiques du cache de réponses (par processus)"""
+    return response_cache.stats()
+
+@app.get("/metrics/password-hasher")
+def password_hasher_metrics():
+    """Occupation du pool de hachage bcrypt (par processus)"""
+    return password_hasher.stats()
+
+@app.get("/metrics/like-buffer")
+def like_buffer_metrics():
+    """Tampon d'écriture différée des likes (par processus)"""
+    return like_buffer.stats()
+
+@app.get("/metrics/comment-stream")
+def comment_stream_metrics():
+    """Abonnés du flux SSE des commentaires (par processus)"""
+    return comment_broker.stats()
+
+@app.get("/metrics/db")
+def db_metrics():
+    """Occupation du pool de connexions de ce processus (dimensionnement vs max_connections)"""
+    return {
+        "pool": pool_status(async_engine.pool),
+        "sync_pool": pool_status(engine.pool),
+        "listener_connections": settings.db_listener_connections,
+        "replica_pool": pool_status(replica_engine.pool) if replica_engine is not None else None,
+        "replica_available": replica_engine is not None and replica_health.available(),
+        "threadpool_size": settings.threadpool_size,
+        "max_connections_per_worker": settings.db_max_connections,
+    }
+
 @app.get("/")
 def root():
     """Root endpoint"""
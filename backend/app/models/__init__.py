@@ -2,6 +2,8 @@ from .user import User
 from .recipe import Recipe
 from .like import Like
 from .comment import Comment
+from .recipe_ingredient import RecipeIngredient
+from .recipe_trending import RecipeTrending, TrendingWatermark
 
-__all__ = ["User", "Recipe", "Like", "Comment"]
+__all__ = ["User", "Recipe", "Like", "Comment", "RecipeIngredient", "RecipeTrending", "TrendingWatermark"]
 
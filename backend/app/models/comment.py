@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, ForeignKey, DateTime, Text
+from sqlalchemy import Integer, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime, timezone
 from ..db.session import Base
@@ -17,3 +17,5 @@ class Comment(Base):
     user = relationship("User", back_populates="comments")
     recipe = relationship("Recipe", back_populates="comments")
 
+# Commentaires d'une recette triés par date (GET /recipes/{id}/comments)
+Index("ix_comments_recipe_id_created_at", Comment.recipe_id, Comment.created_at)
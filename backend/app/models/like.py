@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Integer, ForeignKey, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime, timezone
 from ..db.session import Base
@@ -18,3 +18,6 @@ class Like(Base):
     user = relationship("User", back_populates="likes")
     recipe = relationship("Recipe", back_populates="likes")
 
+# Pagination keyset (created_at DESC, id DESC) : likes d'une recette, favoris d'un utilisateur
+Index("ix_likes_recipe_id_created_at", Like.recipe_id, Like.created_at, Like.id)
+Index("ix_likes_user_id_created_at", Like.user_id, Like.created_at, Like.id)
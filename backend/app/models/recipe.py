@@ -1,4 +1,5 @@
-from sqlalchemy import String, Integer, Text, ForeignKey, DateTime, JSON, ARRAY
+from sqlalchemy import String, Integer, Text, ForeignKey, DateTime, ARRAY, Index, func
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime, timezone
 from ..db.session import Base
@@ -13,16 +14,23 @@ class Recipe(Base):
     prep_time: Mapped[int | None] = mapped_column(Integer, nullable=True)  # minutes
     cook_time: Mapped[int | None] = mapped_column(Integer, nullable=True)  # minutes
     servings: Mapped[int | None] = mapped_column(Integer, nullable=True)
-    difficulty: Mapped[str | None] = mapped_column(String(20), nullable=True)  # facile, moyen, difficile
+    difficulty: Mapped[str | None] = mapped_column(String(20), nullable=True, index=True)  # facile, moyen, difficile
     category: Mapped[str | None] = mapped_column(String(50), nullable=True, index=True)  # entrée, plat, dessert, boisson
     
-    # JSON fields
-    ingredients: Mapped[Any] = mapped_column(JSON, nullable=False)  # [{"name": "...", "quantity": "...", "unit": "..."}]
-    steps: Mapped[Any] = mapped_column(JSON, nullable=False)  # ["step 1", "step 2", ...]
-    images: Mapped[Any | None] = mapped_column(JSON, nullable=True)  # ["image1.jpg", "image2.jpg"]
+    # JSONB fields
+    ingredients: Mapped[Any] = mapped_column(JSONB, nullable=False)  # [{"name": "...", "quantity": "...", "unit": "..."}]
+    steps: Mapped[Any] = mapped_column(JSONB, nullable=False)  # ["step 1", "step 2", ...]
+    images: Mapped[Any | None] = mapped_column(JSONB, nullable=True)  # ["image1.jpg", "image2.jpg"]
     tags: Mapped[Any | None] = mapped_column(ARRAY(String), nullable=True)  # ["français", "dessert"]
     
-    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
+
+    # Compteurs dénormalisés (maintenus par les endpoints likes/comments)
+    likes_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    comments_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    # Document de recherche plein texte, maintenu par le trigger recipes_search_vector_update
+    search_vector: Mapped[Any | None] = mapped_column(TSVECTOR, nullable=True, deferred=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
@@ -31,3 +39,20 @@ class Recipe(Base):
     owner = relationship("User", back_populates="recipes")
     likes = relationship("Like", back_populates="recipe", cascade="all, delete-orphan")
     comments = relationship("Comment", back_populates="recipe", cascade="all, delete-orphan")
+
+# Pagination keyset de GET /recipes (ORDER BY created_at DESC, id DESC)
+Index("ix_recipes_created_at_id", Recipe.created_at.desc(), Recipe.id.desc())
+# Recherche plein texte (search_mode=fulltext)
+Index("ix_recipes_search_vector", Recipe.search_vector, postgresql_using="gin")
+# Suggestions de titres (pg_trgm + unaccent, GET /recipes/suggest)
+Index(
+    "ix_recipes_title_trgm",
+    func.lower(func.immutable_unaccent(Recipe.title)).label("title_unaccent"),
+    postgresql_using="gist",
+    postgresql_ops={"title_unaccent": "gist_trgm_ops"},
+)
+# Filtre tag (tags @> ARRAY[...]) et facettes
+Index("ix_recipes_tags", Recipe.tags, postgresql_using="gin")
+# Containment JSONB (ingredients @> '[{"name": ...}]', images @> '["..."]')
+Index("ix_recipes_ingredients", Recipe.ingredients, postgresql_using="gin", postgresql_ops={"ingredients": "jsonb_path_ops"})
+Index("ix_recipes_images", Recipe.images, postgresql_using="gin", postgresql_ops={"images": "jsonb_path_ops"})
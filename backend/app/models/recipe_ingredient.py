@@ -0,0 +1,13 @@
+from sqlalchemy import Text, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from ..db.session import Base
+
+class RecipeIngredient(Base):
+    """Index inversé des ingrédients : un nom normalisé (minuscules, sans accents) par ligne"""
+    __tablename__ = "recipe_ingredients"
+    __table_args__ = (
+        Index("ix_recipe_ingredients_name_recipe_id", "name", "recipe_id"),
+    )
+
+    recipe_id: Mapped[int] = mapped_column(ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
+    name: Mapped[str] = mapped_column(Text, primary_key=True)
@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+from sqlalchemy import BigInteger, DateTime, Float, ForeignKey, Index, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from ..db.session import Base
+
+class RecipeTrending(Base):
+    """Score de tendance d'une recette, en log : ln(Σ poids × e^(λ (t_événement − époque)))"""
+    __tablename__ = "recipe_trending"
+    __table_args__ = (
+        # GET /recipes/trending : parcours de l'index dans l'ordre du score
+        Index("ix_recipe_trending_score", "score", "recipe_id"),
+    )
+
+    recipe_id: Mapped[int] = mapped_column(ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+class TrendingWatermark(Base):
+    """Dernier identifiant d'événement (like, commentaire) intégré aux scores"""
+    __tablename__ = "trending_watermarks"
+
+    source: Mapped[str] = mapped_column(Text, primary_key=True)
+    last_id: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
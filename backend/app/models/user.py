@@ -19,3 +19,6 @@ class User(Base):
     recipes = relationship("Recipe", back_populates="owner", cascade="all, delete-orphan")
     likes = relationship("Like", back_populates="user", cascade="all, delete-orphan")
     comments = relationship("Comment", back_populates="user", cascade="all, delete-orphan")
+
+# Colonnes exposées par UserPublic (load_only des auteurs de commentaires / likes)
+USER_PUBLIC_COLUMNS = (User.id, User.username, User.bio, User.profile_picture, User.created_at)
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
+from .user import UserPublic
 
 class CommentBase(BaseModel):
     content: str = Field(min_length=1, max_length=1000)
@@ -19,6 +20,6 @@ class CommentOut(CommentBase):
     model_config = ConfigDict(from_attributes=True)
 
 class CommentWithUser(CommentOut):
-    user: dict  # UserPublic
+    user: UserPublic
     model_config = ConfigDict(from_attributes=True)
 
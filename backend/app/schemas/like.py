@@ -1,5 +1,7 @@
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
+from .recipe import RecipeOut
+from .user import UserPublic
 
 class LikeCreate(BaseModel):
     recipe_id: int
@@ -12,6 +14,9 @@ class LikeOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 class LikeWithUser(LikeOut):
-    user: dict  # UserPublic
+    user: UserPublic
     model_config = ConfigDict(from_attributes=True)
 
+
+class LikedRecipeOut(RecipeOut):
+    liked_at: datetime
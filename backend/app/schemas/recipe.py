@@ -44,6 +44,37 @@ class RecipeOut(RecipeBase):
     comments_count: int = 0
     model_config = ConfigDict(from_attributes=True)
 
+class RecipeIngredientMatch(RecipeOut):
+    """Recette classée par couverture des ingrédients disponibles"""
+    matched_ingredients: int
+    total_ingredients: int
+    coverage: float
+
+class TrendingRecipeOut(RecipeOut):
+    """Recette tendance : score décru à l'instant de la requête"""
+    trending_score: float
+
+class RecipeBatchItem(BaseModel):
+    """Entrée de GET /recipes/batch (recipe vaut null si l'id n'existe pas)"""
+    id: int
+    found: bool
+    recipe: RecipeOut | None = None
+
 class RecipeWithOwner(RecipeOut):
     owner: Any  # UserPublic
     model_config = ConfigDict(from_attributes=True)
+
+class RecipeSuggestion(BaseModel):
+    id: int
+    title: str
+    score: float
+
+class FacetCount(BaseModel):
+    value: str | None
+    count: int
+
+class RecipeFacets(BaseModel):
+    total: int
+    category: List[FacetCount]
+    difficulty: List[FacetCount]
+    tags: List[FacetCount]
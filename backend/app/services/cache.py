@@ -0,0 +1,258 @@
+import json
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable
+from urllib.parse import urlencode
+from ..core.config import settings
+
+
+class CacheBackend(ABC):
+    """Interface commune des backends de cache"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Any | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: int, tags: Iterable[str] = ()) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    async def get_counter(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    async def invalidate_tags(self, *tags: str) -> None:
+        """Supprime toutes les entrées associées à l'un des tags"""
+
+
+class NullCache(CacheBackend):
+    """Cache désactivé (CACHE_BACKEND=none)"""
+
+    async def get(self, key):
+        return None
+
+    async def set(self, key, value, ttl, tags=()):
+        pass
+
+    async def delete(self, *keys):
+        pass
+
+    async def incr(self, key):
+        return 0
+
+    async def get_counter(self, key):
+        return 0
+
+    async def invalidate_tags(self, *tags):
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """Cache LRU + TTL local au processus"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any, tuple[str, ...]]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key, value, ttl, tags=()):
+        tags = tuple(tags)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    async def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+    async def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    async def get_counter(self, key):
+        return self._counters.get(key, 0)
+
+    async def invalidate_tags(self, *tags):
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, set()):
+                    self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisCache(CacheBackend):
+    """Cache partagé entre les réplicas (nécessite le paquet redis, client asyncio)"""
+
+    def __init__(self, url: str, prefix: str = "recipe-api:"):
+        from redis import asyncio as redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key):
+        raw = await self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key, value, ttl, tags=()):
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + key, json.dumps(value), ex=ttl)
+        for tag in tags:
+            pipe.sadd(self.prefix + "tag:" + tag, key)
+            pipe.expire(self.prefix + "tag:" + tag, ttl)
+        await pipe.execute()
+
+    async def delete(self, *keys):
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+    async def incr(self, key):
+        return await self.client.incr(self.prefix + key)
+
+    async def get_counter(self, key):
+        return int(await self.client.get(self.prefix + key) or 0)
+
+    async def invalidate_tags(self, *tags):
+        for tag in tags:
+            tag_key = self.prefix + "tag:" + tag
+            keys = await self.client.smembers(tag_key)
+            pipe = self.client.pipeline()
+            if keys:
+                pipe.delete(*(self.prefix + k.decode() for k in keys))
+            pipe.delete(tag_key)
+            await pipe.execute()
+
+
+class ResponseCache:
+    """Cache des réponses des endpoints de lecture des recettes.
+
+    - détail : une entrée par recette, supprimée à chaque écriture sur la recette
+    - listes : clé préfixée par une génération (incrémentée à chaque création,
+      modification ou suppression) et taguée par les recettes de la page, pour
+      invalider précisément les pages concernées par un like ou un commentaire
+    """
+
+    LIST_GENERATION_KEY = "recipes:list:generation"
+    # Présente pendant `write_window` secondes après une écriture (réplica peut-être en retard)
+    RECENT_WRITE_KEY = "recipes:recent-write"
+
+    def __init__(self, backend: CacheBackend, ttl: int, write_window: int = 0):
+        self.backend = backend
+        self.ttl = ttl
+        self.write_window = write_window
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_params(params: dict[str, Any]) -> str:
+        """Paramètres triés, absents ou vides omis (comme dans filter_recipes).
+
+        Les valeurs sont gardées telles quelles : les filtres les utilisent sans
+        normalisation (" a " et "a" ne donnent pas les mêmes résultats).
+        """
+        items = [
+            (name, str(value)) for name, value in sorted(params.items())
+            if value is not None and value != ""
+        ]
+        return urlencode(items)
+
+    def detail_key(self, recipe_id: int) -> str:
+        return f"recipes:detail:{recipe_id}"
+
+    async def list_key(self, route: str, params: dict[str, Any]) -> str:
+        generation = await self.backend.get_counter(self.LIST_GENERATION_KEY)
+        return f"recipes:{route}:g{generation}:{self.normalize_params(params)}"
+
+    async def get(self, key: str) -> Any | None:
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, recipe_ids: Iterable[int] = ()) -> None:
+        await self.backend.set(key, value, self.ttl, tags=[f"recipe:{rid}" for rid in recipe_ids])
+
+    async def invalidate_recipe(self, recipe_id: int) -> None:
+        """Une recette a changé sans modifier l'appartenance aux listes (likes, commentaires)"""
+        await self.backend.delete(self.detail_key(recipe_id))
+        await self.backend.invalidate_tags(f"recipe:{recipe_id}")
+        await self._mark_write()
+
+    async def invalidate_lists(self) -> None:
+        """Création/modification/suppression : toutes les listes peuvent changer"""
+        await self.backend.incr(self.LIST_GENERATION_KEY)
+        await self._mark_write()
+
+    async def _mark_write(self) -> None:
+        if self.write_window:
+            await self.backend.set(self.RECENT_WRITE_KEY, 1, self.write_window)
+
+    async def in_write_window(self) -> bool:
+        """Écriture récente : une lecture du réplica ne doit pas remplir le cache"""
+        return bool(self.write_window) and await self.backend.get(self.RECENT_WRITE_KEY) is not None
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def build_cache_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis" and settings.REDIS_URL:
+        return RedisCache(settings.REDIS_URL)
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryCache(settings.CACHE_MAX_ENTRIES)
+    return NullCache()
+
+# Instance globale du cache
+response_cache = ResponseCache(
+    build_cache_backend(),
+    settings.CACHE_TTL_SECONDS,
+    write_window=settings.REPLICA_STICKY_SECONDS if settings.DATABASE_REPLICA_URL else 0,
+)
@@ -0,0 +1,204 @@
+import asyncio
+import json
+import logging
+from typing import Any
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from ..core.config import settings
+from ..db.session import async_engine
+
+logger = logging.getLogger(__name__)
+
+# Canal LISTEN/NOTIFY partagé par les réplicas
+NOTIFY_CHANNEL = "comment_events"
+# Limite de taille d'un payload NOTIFY (8000 octets) avec une marge
+MAX_NOTIFY_BYTES = 7900
+
+
+def notify_payload(event: dict) -> str:
+    """Événement sérialisé pour NOTIFY ; trop gros, il est réduit à l'id du commentaire
+    (le client recharge le commentaire)"""
+    payload = json.dumps(event)
+    if len(payload.encode()) > MAX_NOTIFY_BYTES:
+        payload = json.dumps({
+            "type": event["type"], "recipe_id": event["recipe_id"], "comment": {"id": event["comment"]["id"]},
+        })
+    return payload
+
+
+class Subscription:
+    """Abonnement d'une connexion SSE aux événements d'une recette.
+
+    File bornée : un client trop lent (file pleine) est désabonné et sa file
+    vidée, il doit recharger les commentaires puis se reconnecter.
+    """
+
+    def __init__(self, broker: "CommentEventBroker", recipe_id: int, max_size: int):
+        self.broker = broker
+        self.recipe_id = recipe_id
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=max_size)
+        self.overflowed = False
+
+    def deliver(self, event: dict) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.broker.dropped += 1
+            self.broker.unsubscribe(self)
+            while not self.queue.empty():
+                self.queue.get_nowait()
+
+    async def get(self, timeout: float) -> dict | None:
+        """Prochain événement ; None si le délai expire ; lève OverflowError si désabonné"""
+        if self.overflowed:
+            raise OverflowError()
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.broker.unsubscribe(self)
+
+
+class CommentEventBroker:
+    """Diffusion des événements de commentaires aux abonnés du processus (en mémoire).
+
+    Convient à une seule instance ; PostgresCommentEventBroker diffuse entre réplicas.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self.published = 0
+        self.dropped = 0
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def subscribe(self, recipe_id: int) -> Subscription:
+        subscription = Subscription(self, recipe_id, self.queue_size)
+        self._subscribers.setdefault(recipe_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.recipe_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.recipe_id]
+
+    def dispatch(self, event: dict) -> None:
+        """Remet l'événement aux abonnés locaux de sa recette"""
+        for subscription in list(self._subscribers.get(event["recipe_id"], ())):
+            subscription.deliver(event)
+
+    async def publish(self, event: dict) -> None:
+        self.published += 1
+        self.dispatch(event)
+
+    def stats(self) -> dict:
+        return {
+            "broker": "memory",
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "recipes": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+class PostgresCommentEventBroker(CommentEventBroker):
+    """Diffusion entre réplicas par LISTEN/NOTIFY PostgreSQL.
+
+    publish() envoie un NOTIFY ; chaque processus (y compris l'émetteur) le reçoit
+    sur une connexion dédiée et le remet à ses abonnés locaux. Les événements émis
+    pendant une coupure de cette connexion sont perdus (reconnexion automatique).
+    """
+
+    # Délai avant reconnexion de l'écoute LISTEN
+    RETRY_SECONDS = 2.0
+
+    def __init__(self, queue_size: int, database_url: str):
+        super().__init__(queue_size)
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._task: asyncio.Task | None = None
+        self.connected = False
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            self.dispatch(json.loads(payload))
+        except (ValueError, KeyError) as exc:
+            logger.warning("Invalid comment event payload: %s", exc)
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                await connection.add_listener(NOTIFY_CHANNEL, self._on_notify)
+                self.connected = True
+                while not connection.is_closed():
+                    await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # Toute erreur (réseau, PostgresError, InterfaceError...) : reconnexion,
+                # sinon la diffusion s'arrêterait pour la vie du processus
+                logger.warning("Comment events listener disconnected, retrying: %s", exc)
+            finally:
+                self.connected = False
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+            await asyncio.sleep(self.RETRY_SECONDS)
+
+    async def publish(self, event: dict) -> None:
+        self.published += 1
+        async with async_engine.connect() as conn:
+            await conn.execute(select(func.pg_notify(NOTIFY_CHANNEL, notify_payload(event))))
+            await conn.commit()
+
+    def stats(self) -> dict:
+        return {**super().stats(), "broker": "postgres", "listener_connected": self.connected}
+
+
+def build_comment_broker() -> CommentEventBroker:
+    if settings.COMMENT_EVENTS_BROKER == "memory":
+        return CommentEventBroker(settings.COMMENT_STREAM_QUEUE_SIZE)
+    return PostgresCommentEventBroker(settings.COMMENT_STREAM_QUEUE_SIZE, settings.DATABASE_URL)
+
+
+# Instance globale du broker
+comment_broker = build_comment_broker()
+
+
+async def publish_comment_event(event_type: str, recipe_id: int, comment: dict) -> None:
+    """Publie un événement après commit ; un échec est journalisé, pas propagé"""
+    try:
+        await comment_broker.publish({"type": event_type, "recipe_id": recipe_id, "comment": comment})
+    except (SQLAlchemyError, OSError) as exc:
+        # Le commentaire est déjà enregistré : pas de 500 (le client réessaierait
+        # et créerait un doublon), y compris pool épuisé (TimeoutError)
+        logger.warning("Comment event %s for recipe %d not published: %s", event_type, recipe_id, exc)
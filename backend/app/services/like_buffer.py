@@ -0,0 +1,215 @@
+import asyncio
+import logging
+from sqlalchemy import Integer, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+from ..core.config import settings
+from ..db.session import AsyncSessionLocal
+from .cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE passagers : connexion (08), transaction annulée (40 : deadlock,
+# sérialisation), ressources (53), arrêt du serveur (57P)
+TRANSIENT_SQLSTATES = ("08", "40", "53", "57P")
+
+
+def is_transient(exc: Exception) -> bool:
+    """Erreur passagère (connexion, pool épuisé, deadlock) : le lot est remis en attente"""
+    if isinstance(exc, (OperationalError, InterfaceError, PoolTimeoutError, OSError)):
+        return True
+    if isinstance(exc, DBAPIError):
+        sqlstate = getattr(exc.orig, "sqlstate", None) or ""
+        return exc.connection_invalidated or sqlstate.startswith(TRANSIENT_SQLSTATES)
+    return False
+
+
+# Likes en lot : recettes inexistantes ignorées (pas d'erreur de clé étrangère pour tout le lot)
+FLUSH_LIKES = text("""
+    WITH inserted AS (
+        INSERT INTO likes (user_id, recipe_id, created_at)
+        SELECT pending.user_id, pending.recipe_id, now()
+        FROM unnest(:user_ids, :recipe_ids) AS pending(user_id, recipe_id)
+        JOIN recipes ON recipes.id = pending.recipe_id
+        ON CONFLICT ON CONSTRAINT unique_user_recipe_like DO NOTHING
+        RETURNING recipe_id
+    ), deltas AS (
+        SELECT recipe_id, count(*) AS n FROM inserted GROUP BY recipe_id
+    )
+    UPDATE recipes SET likes_count = recipes.likes_count + deltas.n
+    FROM deltas WHERE recipes.id = deltas.recipe_id
+    RETURNING recipes.id
+""").bindparams(bindparam("user_ids", type_=ARRAY(Integer)), bindparam("recipe_ids", type_=ARRAY(Integer)))
+
+FLUSH_UNLIKES = text("""
+    WITH deleted AS (
+        DELETE FROM likes
+        USING unnest(:user_ids, :recipe_ids) AS pending(user_id, recipe_id)
+        WHERE likes.user_id = pending.user_id AND likes.recipe_id = pending.recipe_id
+        RETURNING likes.recipe_id
+    ), deltas AS (
+        SELECT recipe_id, count(*) AS n FROM deleted GROUP BY recipe_id
+    )
+    UPDATE recipes SET likes_count = recipes.likes_count - deltas.n
+    FROM deltas WHERE recipes.id = deltas.recipe_id
+    RETURNING recipes.id
+""").bindparams(bindparam("user_ids", type_=ARRAY(Integer)), bindparam("recipe_ids", type_=ARRAY(Integer)))
+
+
+class LikeBuffer:
+    """Écriture différée des likes (LIKE_WRITE_BEHIND), par processus.
+
+    Les PUT / DELETE /like sont regroupés par couple (utilisateur, recette) : seul
+    le dernier état demandé est conservé, puis écrit en deux requêtes multi-lignes
+    toutes les `interval_ms` ou dès `max_events` événements. Les lectures de
+    l'utilisateur (likes/me) consultent d'abord le tampon.
+    """
+
+    def __init__(self, interval_ms: int, max_events: int):
+        self.interval = interval_ms / 1000
+        self.max_events = max_events
+        self._pending: dict[tuple[int, int], bool] = {}
+        # Lot en cours d'écriture : encore visible des lectures jusqu'au commit
+        self._flushing: dict[tuple[int, int], bool] = {}
+        self._events = 0
+        self._wakeup = asyncio.Event()
+        # Une seule écriture à la fois ; take() attend celle qui porte son couple
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.flushed = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+
+    def record(self, user_id: int, recipe_id: int, liked: bool) -> None:
+        self._pending[(user_id, recipe_id)] = liked
+        self._events += 1
+        if self._events >= self.max_events:
+            self._wakeup.set()
+
+    def pending_state(self, user_id: int, recipe_id: int) -> bool | None:
+        """État en attente d'écriture pour le couple, None si aucun"""
+        pair = (user_id, recipe_id)
+        return self._pending.get(pair, self._flushing.get(pair))
+
+    async def take(self, user_id: int, recipe_id: int) -> bool | None:
+        """Retire l'état en attente du couple (pour l'appliquer directement).
+
+        Si le couple est dans le lot en cours d'écriture, attend la fin de
+        celle-ci : validé, il est en base ; en échec passager, il est remis en attente.
+        """
+        pair = (user_id, recipe_id)
+        if pair in self._flushing:
+            async with self._flush_lock:
+                pass
+        return self._pending.pop(pair, None)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Arrêt propre : dernier flush du tampon"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Like buffer flush failed")
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending, self._events = self._pending, {}, 0
+        self._flushing = batch
+        try:
+            try:
+                recipe_ids = await self._write(batch)
+                written = len(batch)
+            except Exception as exc:
+                if is_transient(exc):
+                    self._requeue(batch, exc)
+                    return
+                # Erreur permanente (IntegrityError, DataError...) : remis en attente, le
+                # lot bloquerait tous les flushes suivants ; rejoué couple par couple,
+                # seuls les couples en erreur sont abandonnés
+                logger.warning("Like buffer batch of %d entries rejected, writing one by one: %s", len(batch), exc)
+                recipe_ids, written = await self._write_each(batch)
+        finally:
+            self._flushing = {}
+        self.flushed += written
+        self.batches += 1
+        for recipe_id in recipe_ids:
+            await response_cache.invalidate_recipe(recipe_id)
+
+    async def _write(self, batch: dict[tuple[int, int], bool]) -> set[int]:
+        """Écrit le lot en une transaction ; renvoie les recettes modifiées"""
+        # Ordre stable des lignes verrouillées entre flushes concurrents
+        likes = sorted(pair for pair, liked in batch.items() if liked)
+        unlikes = sorted(pair for pair, liked in batch.items() if not liked)
+        recipe_ids = set()
+        async with AsyncSessionLocal() as db:
+            for statement, pairs in ((FLUSH_LIKES, likes), (FLUSH_UNLIKES, unlikes)):
+                if pairs:
+                    user_ids, pair_recipe_ids = zip(*pairs)
+                    result = await db.execute(
+                        statement, {"user_ids": list(user_ids), "recipe_ids": list(pair_recipe_ids)}
+                    )
+                    recipe_ids.update(result.scalars())
+            await db.commit()
+        return recipe_ids
+
+    async def _write_each(self, batch: dict[tuple[int, int], bool]) -> tuple[set[int], int]:
+        """Écrit le lot couple par couple ; renvoie les recettes modifiées et le nombre écrit"""
+        recipe_ids, written = set(), 0
+        pairs = sorted(batch)
+        for index, pair in enumerate(pairs):
+            try:
+                recipe_ids |= await self._write({pair: batch[pair]})
+                written += 1
+            except Exception as exc:
+                if is_transient(exc):
+                    self._requeue({rest: batch[rest] for rest in pairs[index:]}, exc)
+                    break
+                self.dropped += 1
+                logger.error("Like buffer entry user=%d recipe=%d dropped: %s", *pair, exc)
+        return recipe_ids, written
+
+    def _requeue(self, batch: dict[tuple[int, int], bool], exc: Exception) -> None:
+        # Remis en attente sauf si une demande plus récente a remplacé l'état
+        self.failures += 1
+        for pair, liked in batch.items():
+            self._pending.setdefault(pair, liked)
+        logger.warning("Like buffer flush failed, %d entries requeued: %s", len(batch), exc)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.LIKE_WRITE_BEHIND,
+            "pending": len(self._pending),
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dropped": self.dropped,
+        }
+
+
+# Instance globale du tampon (utilisée seulement si LIKE_WRITE_BEHIND)
+like_buffer = LikeBuffer(settings.LIKE_FLUSH_INTERVAL_MS, settings.LIKE_FLUSH_MAX_EVENTS)
@@ -0,0 +1,51 @@
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.like import Like
+from ..models.recipe import Recipe
+from .recipe_counters import KEEP_UPDATED_AT
+
+
+async def add_like(db: AsyncSession, user_id: int, recipe_id: int) -> bool:
+    """Like idempotent en une requête (INSERT ... ON CONFLICT DO NOTHING + compteur).
+
+    Retourne True si le like a été créé. Recette inexistante : IntegrityError
+    (violation de clé étrangère, 23503). created_at est fixé en SQL : les
+    défauts Python ne sont pas appliqués à une requête avec CTE DML.
+    """
+    inserted = (
+        insert(Like)
+        .values(user_id=user_id, recipe_id=recipe_id, created_at=func.now())
+        .on_conflict_do_nothing(constraint="unique_user_recipe_like")
+        .returning(Like.recipe_id)
+        .cte("inserted")
+    )
+    result = await db.execute(
+        update(Recipe)
+        .where(Recipe.id == inserted.c.recipe_id)
+        .values(likes_count=Recipe.likes_count + 1, **KEEP_UPDATED_AT)
+        .returning(Recipe.id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.first() is not None
+
+
+async def remove_like(db: AsyncSession, user_id: int, recipe_id: int) -> bool:
+    """Unlike idempotent en une requête (DELETE ... RETURNING + compteur).
+
+    Retourne True si un like a été supprimé.
+    """
+    deleted = (
+        delete(Like)
+        .where(Like.user_id == user_id, Like.recipe_id == recipe_id)
+        .returning(Like.recipe_id)
+        .cte("deleted")
+    )
+    result = await db.execute(
+        update(Recipe)
+        .where(Recipe.id == deleted.c.recipe_id)
+        .values(likes_count=Recipe.likes_count - 1, **KEEP_UPDATED_AT)
+        .returning(Recipe.id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.first() is not None
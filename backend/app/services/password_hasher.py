@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from ..core.config import settings
+from ..core.security import get_password_hash, verify_password
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusy(Exception):
+    """File d'attente du pool de hachage pleine"""
+
+
+class PasswordHasher:
+    """bcrypt dans un pool de processus dédié, borné.
+
+    Le hachage (~250 ms CPU) ne tient ni le GIL ni un thread du serveur : les
+    autres endpoints restent servis pendant une rafale de connexions. Au-delà de
+    `workers + queue_size` hachages en cours, les appels échouent immédiatement
+    (PasswordHasherBusy) au lieu de s'accumuler.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.max_pending = workers + queue_size
+        self.pending = 0
+        self.rejected = 0
+        self.restarts = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    def start(self) -> None:
+        if self._executor is None:
+            # spawn : pas de fork d'un processus qui a déjà une boucle et des threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        self.start()
+        self.pending += 1
+        try:
+            executor = self._executor
+            try:
+                return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+            except BrokenProcessPool:
+                # Processus du pool tué (OOM...) : le pool est inutilisable, recréé
+                # puis un seul nouvel essai
+                self._restart(executor)
+                return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        # Les appels en échec sur le même pool ne le recréent qu'une fois
+        if self._executor is broken:
+            logger.warning("Password hasher process pool broken, restarting")
+            self.restarts += 1
+            self.shutdown()
+            self.start()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+        }
+
+
+# Instance globale du pool
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.PASSWORD_HASH_QUEUE_SIZE)
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from ..core.config import settings
+from ..models.user import User
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Utilisateur authentifié (instantané détaché de la session, sans mot de passe)"""
+    id: int
+    username: str
+    email: str
+    bio: str | None
+    profile_picture: str | None
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            bio=user.bio,
+            profile_picture=user.profile_picture,
+            created_at=user.created_at,
+        )
+
+
+class PrincipalCache:
+    """Cache LRU + TTL des utilisateurs authentifiés, par processus.
+
+    Clé : sujet du token (identifiant numérique, ou email pour les anciens tokens).
+    """
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Principal]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(user_id: int | None, email: str | None) -> str:
+        return f"id:{user_id}" if user_id is not None else f"email:{email}"
+
+    def get(self, key: str) -> Principal | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def set(self, key: str, principal: Principal) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Supprime toutes les entrées de l'utilisateur (clé id ou email)"""
+        with self._lock:
+            for key in [k for k, (_, p) in self._entries.items() if p.id == user_id]:
+                del self._entries[key]
+
+
+# Instance globale du cache
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_MAX_ENTRIES, settings.PRINCIPAL_CACHE_TTL_SECONDS)
@@ -0,0 +1,98 @@
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..models.recipe import Recipe
+from ..models.like import Like
+from ..models.comment import Comment
+
+# updated_at garde la date de la dernière modification du contenu : sans cette
+# valeur explicite, UPDATE recipes appliquerait l'onupdate Python de la colonne
+KEEP_UPDATED_AT = {"updated_at": Recipe.updated_at}
+
+
+async def increment_likes_count(db: AsyncSession, recipe_id: int, delta: int) -> None:
+    """Met à jour likes_count de façon atomique (UPDATE ... SET likes_count = likes_count + delta)"""
+    await db.execute(
+        update(Recipe)
+        .where(Recipe.id == recipe_id)
+        .values(likes_count=Recipe.likes_count + delta, **KEEP_UPDATED_AT)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def increment_comments_count(db: AsyncSession, recipe_id: int, delta: int) -> None:
+    """Met à jour comments_count de façon atomique"""
+    await db.execute(
+        update(Recipe)
+        .where(Recipe.id == recipe_id)
+        .values(comments_count=Recipe.comments_count + delta, **KEEP_UPDATED_AT)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# Recettes verrouillées et recalculées par transaction
+RECONCILE_BATCH_SIZE = 1000
+
+
+def reconcile_recipe_counts(db: Session, batch_size: int = RECONCILE_BATCH_SIZE) -> int:
+    """Recalcule les compteurs par lots de recettes et corrige les dérives.
+
+    Chaque lot verrouille ses recettes (SELECT ... FOR UPDATE) avant de compter :
+    un like ou un commentaire validé pendant le recalcul attend la fin du lot et
+    s'ajoute au compteur corrigé au lieu d'être écrasé. Sûr en production.
+
+    Retourne le nombre de recettes dont les compteurs ont été corrigés.
+    """
+    fixed, last_id = 0, 0
+    while True:
+        recipe_ids = db.execute(
+            select(Recipe.id)
+            .where(Recipe.id > last_id)
+            .order_by(Recipe.id)
+            .limit(batch_size)
+            .with_for_update()
+        ).scalars().all()
+        if not recipe_ids:
+            db.commit()
+            return fixed
+        fixed += _reconcile_batch(db, recipe_ids)
+        db.commit()
+        last_id = recipe_ids[-1]
+
+
+def _reconcile_batch(db: Session, recipe_ids: list[int]) -> int:
+    # Nouvel instantané (READ COMMITTED) pris après le verrouillage
+    likes = (
+        select(Like.recipe_id, func.count().label("n"))
+        .where(Like.recipe_id.in_(recipe_ids))
+        .group_by(Like.recipe_id)
+        .subquery()
+    )
+    comments = (
+        select(Comment.recipe_id, func.count().label("n"))
+        .where(Comment.recipe_id.in_(recipe_ids))
+        .group_by(Comment.recipe_id)
+        .subquery()
+    )
+    actual = (
+        select(
+            Recipe.id.label("recipe_id"),
+            func.coalesce(likes.c.n, 0).label("likes_count"),
+            func.coalesce(comments.c.n, 0).label("comments_count"),
+        )
+        .where(Recipe.id.in_(recipe_ids))
+        .outerjoin(likes, likes.c.recipe_id == Recipe.id)
+        .outerjoin(comments, comments.c.recipe_id == Recipe.id)
+        .subquery()
+    )
+    result = db.execute(
+        update(Recipe)
+        .where(Recipe.id == actual.c.recipe_id)
+        .where(
+            (Recipe.likes_count != actual.c.likes_count)
+            | (Recipe.comments_count != actual.c.comments_count)
+        )
+        .values(likes_count=actual.c.likes_count, comments_count=actual.c.comments_count, **KEEP_UPDATED_AT)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
@@ -0,0 +1,37 @@
+from typing import Iterable
+from sqlalchemy import String, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.recipe_ingredient import RecipeIngredient
+
+
+def normalize_ingredient_name(expr):
+    """Normalisation SQL des noms d'ingrédients (identique à celle de la migration 0006)"""
+    return func.lower(func.immutable_unaccent(func.btrim(expr)))
+
+
+def normalized_names_select(names: Iterable[str]):
+    """SELECT des noms normalisés, utilisable dans un IN (...)"""
+    values = func.unnest(literal(list(names), ARRAY(String))).table_valued("name").render_derived()
+    return (
+        select(normalize_ingredient_name(values.c.name))
+        .where(func.btrim(values.c.name) != "")
+        .distinct()
+    )
+
+
+async def sync_recipe_ingredients(db: AsyncSession, recipe_id: int, ingredients: list[dict]) -> None:
+    """Remplace les entrées de l'index inversé d'une recette (même transaction que la recette)"""
+    await db.execute(delete(RecipeIngredient).where(RecipeIngredient.recipe_id == recipe_id))
+    names = [ing.get("name") for ing in ingredients if isinstance(ing, dict) and ing.get("name")]
+    if not names:
+        return
+    names_select = normalized_names_select(names).subquery()
+    await db.execute(
+        insert(RecipeIngredient)
+        .from_select(
+            ["recipe_id", "name"],
+            select(literal(recipe_id), names_select.c[0]),
+        )
+        .on_conflict_do_nothing()
+    )
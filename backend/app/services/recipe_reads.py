@@ -0,0 +1,52 @@
+from typing import Iterable, Mapping
+from pydantic_core import to_jsonable_python
+from sqlalchemy import select
+from ..models.recipe import Recipe
+
+# Colonnes de RecipeOut, dans l'ordre des champs du schéma
+RECIPE_OUT_COLUMNS = (
+    Recipe.title,
+    Recipe.description,
+    Recipe.prep_time,
+    Recipe.cook_time,
+    Recipe.servings,
+    Recipe.difficulty,
+    Recipe.category,
+    Recipe.ingredients,
+    Recipe.steps,
+    Recipe.tags,
+    Recipe.id,
+    Recipe.owner_id,
+    Recipe.images,
+    Recipe.created_at,
+    Recipe.updated_at,
+    Recipe.likes_count,
+    Recipe.comments_count,
+)
+
+
+def recipe_out_select(*extra_columns):
+    """select() Core des colonnes de RecipeOut : lignes simples, sans identity map ORM"""
+    return select(*RECIPE_OUT_COLUMNS, *extra_columns)
+
+
+def recipe_row_json(row: Mapping) -> dict:
+    """Ligne (mapping) -> dict JSON au format de RecipeOut.model_dump(mode="json").
+
+    Les données ont été validées à l'écriture : seuls les champs JSON hérités
+    (non-listes) sont normalisés comme dans recipe_to_out, et seules les dates
+    sont converties (même format que pydantic).
+    """
+    data = dict(row)
+    if not isinstance(data["ingredients"], list):
+        data["ingredients"] = []
+    if not isinstance(data["steps"], list):
+        data["steps"] = []
+    data["created_at"] = to_jsonable_python(data["created_at"])
+    data["updated_at"] = to_jsonable_python(data["updated_at"])
+    return data
+
+
+def recipe_rows_json(rows: Iterable[Mapping]) -> list[dict]:
+    """Lignes -> payload JSON, sans objets ORM ni modèles pydantic intermédiaires"""
+    return [recipe_row_json(row) for row in rows]
@@ -0,0 +1,97 @@
+import math
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.comment import Comment
+from ..models.like import Like
+from ..models.recipe_trending import RecipeTrending, TrendingWatermark
+
+# Origine fixe des scores : l'ordre des scores stockés ne dépend pas de l'instant
+# du calcul, et la valeur (en log) croît linéairement avec le temps, sans débordement
+TRENDING_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+
+# Scores décrus sous ce seuil supprimés : la table ne garde que les recettes actives
+MIN_TRENDING_SCORE = 0.01
+
+# Somme log-sum-exp des nouveaux événements par recette, fusionnée au score existant.
+# exp() est borné : PostgreSQL lève une erreur en cas de dépassement inférieur
+MERGE_EVENTS = text("""
+    WITH events AS (
+        SELECT recipe_id, :rate * (extract(epoch FROM coalesce(created_at, now())) - :epoch)
+                          + ln(:like_weight) AS x
+        FROM likes WHERE id > :likes_from AND id <= :likes_to
+        UNION ALL
+        SELECT recipe_id, :rate * (extract(epoch FROM coalesce(created_at, now())) - :epoch)
+                          + ln(:comment_weight)
+        FROM comments WHERE id > :comments_from AND id <= :comments_to
+    ), peaks AS (
+        SELECT recipe_id, x, max(x) OVER (PARTITION BY recipe_id) AS peak FROM events
+    ), batch AS (
+        SELECT recipe_id, peak + ln(sum(exp(greatest(x - peak, -700)))) AS score
+        FROM peaks GROUP BY recipe_id, peak
+    )
+    INSERT INTO recipe_trending (recipe_id, score, updated_at)
+    SELECT recipe_id, score, now() FROM batch
+    ON CONFLICT (recipe_id) DO UPDATE SET
+        score = greatest(recipe_trending.score, excluded.score)
+                + ln(1 + exp(-least(abs(recipe_trending.score - excluded.score), 700))),
+        updated_at = excluded.updated_at
+""")
+
+
+def decay_rate() -> float:
+    """λ (par seconde) de la décroissance exponentielle"""
+    return math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+
+
+def score_offset(at: float) -> float:
+    """Décroissance cumulée depuis l'origine : score à l'instant `at` = exp(score - offset)"""
+    return decay_rate() * (at - TRENDING_EPOCH)
+
+
+def update_trending_scores(db: Session) -> int:
+    """Intègre aux scores les likes et commentaires apparus depuis le dernier passage.
+
+    Les événements sont lus au-delà du dernier identifiant traité (watermark), à
+    condition d'avoir au moins TRENDING_SETTLE_SECONDS. Au mieux : ce délai laisse
+    aux transactions en cours le temps d'être validées, mais un événement validé
+    plus de TRENDING_SETTLE_SECONDS après son created_at, sous un identifiant
+    déjà dépassé, n'est jamais compté. Les suppressions (unlike, commentaire
+    supprimé) ne retirent rien du score.
+
+    Retourne le nombre de recettes dont le score a changé.
+    """
+    # Verrou des watermarks : un seul passage à la fois
+    marks = dict(db.execute(
+        select(TrendingWatermark.source, TrendingWatermark.last_id).with_for_update()
+    ).all())
+    settled = func.now() - timedelta(seconds=settings.TRENDING_SETTLE_SECONDS)
+    likes_to = db.execute(
+        select(func.max(Like.id)).where(Like.id > marks["likes"], Like.created_at < settled)
+    ).scalar() or marks["likes"]
+    comments_to = db.execute(
+        select(func.max(Comment.id)).where(Comment.id > marks["comments"], Comment.created_at < settled)
+    ).scalar() or marks["comments"]
+
+    updated = 0
+    if likes_to > marks["likes"] or comments_to > marks["comments"]:
+        updated = db.execute(MERGE_EVENTS, {
+            "rate": decay_rate(),
+            "epoch": TRENDING_EPOCH,
+            "like_weight": settings.TRENDING_LIKE_WEIGHT,
+            "comment_weight": settings.TRENDING_COMMENT_WEIGHT,
+            "likes_from": marks["likes"],
+            "likes_to": likes_to,
+            "comments_from": marks["comments"],
+            "comments_to": comments_to,
+        }).rowcount
+        for source, last_id in (("likes", likes_to), ("comments", comments_to)):
+            db.execute(
+                update(TrendingWatermark).where(TrendingWatermark.source == source).values(last_id=last_id)
+            )
+
+    floor = score_offset(datetime.now(timezone.utc).timestamp()) + math.log(MIN_TRENDING_SCORE)
+    db.execute(delete(RecipeTrending).where(RecipeTrending.score < floor))
+    db.commit()
+    return updated
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Benchmark de charge : débit d'un worker uvicorn sous lectures concurrentes.
+
+Lancer l'API avec un seul worker et sans cache de réponses (pour mesurer la
+base de données et non le cache), puis ce script :
+
+    CACHE_BACKEND=none uvicorn app.main:app --workers 1 --port 8000
+    python benchmarks/bench_concurrent_reads.py --url http://localhost:8000 --concurrency 64
+
+Pour comparer deux versions (ex. pile synchrone / asynchrone), exécuter le
+script contre chacune avec les mêmes paramètres et comparer req/s et p99.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+
+
+async def pick_recipe_ids(client: httpx.AsyncClient, count: int) -> list[int]:
+    response = await client.get("/api/v1/recipes/", params={"limit": count})
+    response.raise_for_status()
+    ids = [recipe["id"] for recipe in response.json()]
+    if not ids:
+        raise SystemExit("Aucune recette en base : lancer init-data.py avant le benchmark")
+    return ids
+
+
+def read_paths(recipe_ids: list[int]) -> list[str]:
+    """Mélange de lectures représentatif du front (liste, détail, compteur de likes)"""
+    recipe_id = random.choice(recipe_ids)
+    return [
+        "/api/v1/recipes/?limit=20",
+        f"/api/v1/recipes/{recipe_id}",
+        f"/api/v1/recipes/{recipe_id}/likes/count",
+    ]
+
+
+async def worker(client: httpx.AsyncClient, recipe_ids: list[int], deadline: float,
+                 latencies: list[float], errors: list[int]) -> None:
+    while time.perf_counter() < deadline:
+        path = random.choice(read_paths(recipe_ids))
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError:
+            errors.append(0)
+        latencies.append(time.perf_counter() - started)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(url: str, concurrency: int, duration: float, warmup: float) -> None:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        recipe_ids = await pick_recipe_ids(client, 100)
+
+        if warmup:
+            await asyncio.gather(*(
+                worker(client, recipe_ids, time.perf_counter() + warmup, [], [])
+                for _ in range(concurrency)
+            ))
+
+        latencies: list[float] = []
+        errors: list[int] = []
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            worker(client, recipe_ids, deadline, latencies, errors) for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    print(f"URL          : {url}")
+    print(f"Concurrence  : {concurrency}")
+    print(f"Requêtes     : {len(latencies)} en {elapsed:.1f}s ({len(errors)} erreurs)")
+    print(f"Débit        : {len(latencies) / elapsed:.1f} req/s")
+    print(f"Latence p50  : {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"Latence p95  : {percentile(latencies, 95) * 1000:.1f} ms")
+    print(f"Latence p99  : {percentile(latencies, 99) * 1000:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0, help="durée de la mesure (s)")
+    parser.add_argument("--warmup", type=float, default=3.0, help="durée du préchauffage (s)")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.concurrency, args.duration, args.warmup))
+
+
+if __name__ == "__main__":
+    main()
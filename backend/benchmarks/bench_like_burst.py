@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Benchmark : rafale de likes sur une recette virale, écriture directe vs différée.
+
+Crée --users comptes directement en base (tokens signés localement : même
+JWT_SECRET que l'API), puis chaque client enchaîne PUT / DELETE
+/recipes/{id}/like sur la même recette. Affiche le débit, la latence et vérifie
+à la fin que recipes.likes_count correspond à la table likes.
+
+    CACHE_BACKEND=none uvicorn app.main:app --workers 1 --port 8000
+    LIKE_WRITE_BEHIND=true CACHE_BACKEND=none uvicorn app.main:app --workers 1 --port 8000
+    python benchmarks/bench_like_burst.py --url http://localhost:8000 --users 200 --concurrency 64
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+
+
+def create_users(count: int) -> list[int]:
+    prefix = f"likeburst_{uuid.uuid4().hex[:8]}"
+    with SessionLocal() as db:
+        ids = db.execute(text(
+            "INSERT INTO users (username, email, hashed_password, created_at) "
+            "SELECT :prefix || '_' || g, :prefix || '_' || g || '@example.com', 'x', now() "
+            "FROM generate_series(1, :count) g RETURNING id"
+        ), {"prefix": prefix, "count": count}).scalars().all()
+        db.commit()
+    return ids
+
+
+def like_counts(recipe_id: int) -> tuple[int, int]:
+    """(recipes.likes_count, nombre réel de likes)"""
+    with SessionLocal() as db:
+        return db.execute(text(
+            "SELECT likes_count, (SELECT count(*) FROM likes WHERE recipe_id = :r) FROM recipes WHERE id = :r"
+        ), {"r": recipe_id}).one()
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def worker(client: httpx.AsyncClient, tokens: list[str], path: str, deadline: float,
+                 latencies: list[float], errors: list[int]) -> None:
+    while time.perf_counter() < deadline:
+        headers = {"Authorization": f"Bearer {random.choice(tokens)}"}
+        method = random.choice(["PUT", "DELETE"])
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, headers=headers)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError:
+            errors.append(0)
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(url: str, users: int, concurrency: int, duration: float, settle: float) -> None:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        response = await client.get("/api/v1/recipes/", params={"limit": 1})
+        response.raise_for_status()
+        if not response.json():
+            raise SystemExit("Aucune recette en base : lancer init-data.py avant le benchmark")
+        recipe_id = response.json()[0]["id"]
+        tokens = [create_access_token(subject="", user_id=user_id) for user_id in create_users(users)]
+        buffer = (await client.get("/metrics/like-buffer")).json()
+
+        latencies: list[float] = []
+        errors: list[int] = []
+        started = time.perf_counter()
+        deadline = started + duration
+        path = f"/api/v1/recipes/{recipe_id}/like"
+        await asyncio.gather(*(
+            worker(client, tokens, path, deadline, latencies, errors) for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+        # Dernier flush du tampon avant la vérification
+        await asyncio.sleep(settle)
+        buffer_after = (await client.get("/metrics/like-buffer")).json()
+
+    likes_count, actual = like_counts(recipe_id)
+    print(f"URL          : {url}  (écriture différée : {'oui' if buffer['enabled'] else 'non'})")
+    print(f"Recette      : {recipe_id}, {users} utilisateurs, concurrence {concurrency}")
+    print(f"Requêtes     : {len(latencies)} en {elapsed:.1f}s ({len(errors)} erreurs)")
+    print(f"Débit        : {len(latencies) / elapsed:.1f} req/s")
+    print(f"Latence p50  : {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"Latence p99  : {percentile(latencies, 99) * 1000:.1f} ms")
+    if buffer["enabled"]:
+        batches = buffer_after["batches"] - buffer["batches"]
+        flushed = buffer_after["flushed"] - buffer["flushed"]
+        print(f"Flushes      : {batches} lots, {flushed} lignes ({buffer_after['pending']} en attente)")
+    print(f"Cohérence    : likes_count={likes_count}, likes={actual} -> {'OK' if likes_count == actual else 'ÉCART'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15.0, help="durée de la rafale (s)")
+    parser.add_argument("--settle", type=float, default=2.0, help="attente du dernier flush (s)")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.users, args.concurrency, args.duration, args.settle))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Benchmark : rafale de connexions et latence des autres endpoints.
+
+Des clients enchaînent POST /auth/login (bcrypt) pendant que d'autres lisent
+des endpoints sans rapport (liste et détail de recettes). Mesure le débit des
+connexions (réussies / refusées en 503) et le p99 des lectures, à comparer avec
+le p99 des mêmes lectures sans rafale (phase « référence »).
+
+    CACHE_BACKEND=none uvicorn app.main:app --workers 1 --port 8000
+    python benchmarks/bench_login_storm.py --url http://localhost:8000 --logins 32 --readers 8
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+import httpx
+
+PASSWORD = "BenchPassword123!"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def create_account(client: httpx.AsyncClient) -> str:
+    name = f"bench_{uuid.uuid4().hex[:12]}"
+    email = f"{name}@example.com"
+    response = await client.post(
+        "/api/v1/auth/register", json={"username": name, "email": email, "password": PASSWORD}
+    )
+    response.raise_for_status()
+    return email
+
+
+async def login_worker(client: httpx.AsyncClient, email: str, deadline: float,
+                       latencies: list[float], rejected: list[int], errors: list[int]) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.post("/api/v1/auth/login", json={"email": email, "password": PASSWORD})
+        except httpx.HTTPError:
+            errors.append(0)
+            continue
+        if response.status_code == 503:
+            rejected.append(503)
+            await asyncio.sleep(float(response.headers.get("Retry-After", "1")))
+        elif response.status_code >= 400:
+            errors.append(response.status_code)
+        else:
+            latencies.append(time.perf_counter() - started)
+
+
+async def read_worker(client: httpx.AsyncClient, recipe_ids: list[int], deadline: float,
+                      latencies: list[float], errors: list[int]) -> None:
+    while time.perf_counter() < deadline:
+        path = random.choice(["/api/v1/recipes/?limit=20", f"/api/v1/recipes/{random.choice(recipe_ids)}"])
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError:
+            errors.append(0)
+        latencies.append(time.perf_counter() - started)
+
+
+async def read_phase(client: httpx.AsyncClient, recipe_ids: list[int], readers: int,
+                     duration: float) -> tuple[list[float], list[int]]:
+    latencies: list[float] = []
+    errors: list[int] = []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(read_worker(client, recipe_ids, deadline, latencies, errors) for _ in range(readers)))
+    return latencies, errors
+
+
+def print_reads(label: str, latencies: list[float], errors: list[int], elapsed: float) -> None:
+    print(f"{label:<10}: {len(latencies) / elapsed:7.1f} req/s  p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+          f"p99 {percentile(latencies, 99) * 1000:7.1f} ms  ({len(errors)} erreurs)")
+
+
+async def run(url: str, logins: int, readers: int, duration: float) -> None:
+    limits = httpx.Limits(max_connections=logins + readers, max_keepalive_connections=logins + readers)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        response = await client.get("/api/v1/recipes/", params={"limit": 100})
+        response.raise_for_status()
+        recipe_ids = [recipe["id"] for recipe in response.json()]
+        if not recipe_ids:
+            raise SystemExit("Aucune recette en base : lancer init-data.py avant le benchmark")
+        emails = [await create_account(client) for _ in range(logins)]
+
+        baseline, baseline_errors = await read_phase(client, recipe_ids, readers, duration)
+
+        login_latencies: list[float] = []
+        rejected: list[int] = []
+        login_errors: list[int] = []
+        started = time.perf_counter()
+        deadline = started + duration
+        storm = asyncio.gather(*(
+            login_worker(client, email, deadline, login_latencies, rejected, login_errors) for email in emails
+        ))
+        reads, read_errors = await read_phase(client, recipe_ids, readers, duration)
+        await storm
+        elapsed = time.perf_counter() - started
+
+    print(f"URL        : {url}  ({logins} clients login, {readers} lecteurs, {duration:.0f}s par phase)")
+    print_reads("référence", baseline, baseline_errors, duration)
+    print_reads("rafale", reads, read_errors, duration)
+    print(f"connexions: {len(login_latencies) / elapsed:7.1f} login/s  "
+          f"p50 {statistics.median(login_latencies) * 1000:7.1f} ms  "
+          f"p99 {percentile(login_latencies, 99) * 1000:7.1f} ms  "
+          f"({len(rejected)} refusées 503, {len(login_errors)} erreurs)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=32, help="clients enchaînant les connexions")
+    parser.add_argument("--readers", type=int, default=8, help="clients lisant des recettes")
+    parser.add_argument("--duration", type=float, default=15.0, help="durée de chaque phase (s)")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.logins, args.readers, args.duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Microbenchmark : page de 100 recettes, chemin ORM vs chemin Core.
+
+- orm  : select(Recipe) -> objets ORM -> recipe_to_out -> model_dump(mode="json")
+- core : recipe_out_select() -> lignes (mappings) -> recipe_rows_json
+
+Mesure le temps CPU et le pic d'allocation mémoire par requête (le rendu JSON
+de la réponse est inclus). Nécessite au moins --page recettes en base :
+
+    python benchmarks/bench_recipe_read_path.py --iterations 200
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select  # noqa: E402
+from app.api.v1.endpoints.recipes import recipe_to_out  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.models.recipe import Recipe  # noqa: E402
+from app.services.recipe_reads import recipe_out_select, recipe_rows_json  # noqa: E402
+
+ORDER = (Recipe.created_at.desc(), Recipe.id.desc())
+
+
+def orm_page(page: int) -> bytes:
+    with SessionLocal() as db:
+        recipes = db.execute(select(Recipe).order_by(*ORDER).limit(page)).scalars().all()
+        items = [recipe_to_out(r).model_dump(mode="json") for r in recipes]
+    return json.dumps(items).encode()
+
+
+def core_page(page: int) -> bytes:
+    with SessionLocal() as db:
+        rows = db.execute(recipe_out_select().order_by(*ORDER).limit(page)).mappings().all()
+        items = recipe_rows_json(rows)
+    return json.dumps(items).encode()
+
+
+def measure(fn, page: int, iterations: int) -> tuple[float, int]:
+    """Temps CPU moyen (ms) et pic d'allocation moyen (octets) par requête"""
+    for _ in range(10):
+        fn(page)
+    started = time.process_time()
+    for _ in range(iterations):
+        fn(page)
+    cpu_ms = (time.process_time() - started) / iterations * 1000
+
+    peaks = []
+    tracemalloc.start()
+    for _ in range(min(iterations, 50)):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        fn(page)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+    return cpu_ms, sum(peaks) // len(peaks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    orm_body, core_body = orm_page(args.page), core_page(args.page)
+    if len(json.loads(core_body)) < args.page:
+        raise SystemExit(f"Moins de {args.page} recettes en base")
+    if json.loads(orm_body) != json.loads(core_body):
+        raise SystemExit("Les deux chemins ne produisent pas la même réponse")
+
+    results = {name: measure(fn, args.page, args.iterations) for name, fn in (("orm", orm_page), ("core", core_page))}
+    print(f"{'chemin':<6} {'CPU/requête':>12} {'pic mémoire':>12}")
+    for name, (cpu_ms, peak) in results.items():
+        print(f"{name:<6} {cpu_ms:>9.2f} ms {peak / 1024:>9.0f} KiB")
+    (orm_cpu, orm_peak), (core_cpu, core_peak) = results["orm"], results["core"]
+    print(f"gain   {(1 - core_cpu / orm_cpu) * 100:>10.0f} % {(1 - core_peak / orm_peak) * 100:>10.0f} %")
+
+
+if __name__ == "__main__":
+    main()
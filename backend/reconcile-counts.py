@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""Script pour recalculer les compteurs likes_count / comments_count des recettes"""
+import os
+import sys
+
+# Ajouter le chemin du backend au PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.session import SessionLocal
+from app.services.recipe_counters import reconcile_recipe_counts
+
+def main():
+    with SessionLocal() as db:
+        fixed = reconcile_recipe_counts(db)
+    print(f'✅ Compteurs recalculés: {fixed} recette(s) corrigée(s)')
+
+if __name__ == "__main__":
+    main()
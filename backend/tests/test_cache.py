@@ -0,0 +1,88 @@
+"""Cache des réponses (backend mémoire), sans base de données."""
+import asyncio
+
+import pytest
+
+from app.services import cache as cache_module
+from app.services.cache import CacheBackend, MemoryCache, NullCache, RedisCache, ResponseCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_backends_implement_the_whole_interface():
+    class Incomplete(CacheBackend):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    # Aucune méthode abstraite restante : instanciables
+    assert not NullCache.__abstractmethods__
+    assert not MemoryCache.__abstractmethods__
+    assert not RedisCache.__abstractmethods__
+
+
+def test_normalize_params_keeps_raw_values():
+    normalize = ResponseCache.normalize_params
+    assert normalize({"search": "a", "limit": 20, "tag": None, "category": ""}) == "limit=20&search=a"
+    # filter_recipes utilise les valeurs brutes : clés distinctes
+    assert normalize({"search": " a "}) != normalize({"search": "a"})
+
+
+def test_memory_cache_lru_eviction():
+    async def scenario():
+        cache = MemoryCache(max_entries=2)
+        await cache.set("a", 1, ttl=60)
+        await cache.set("b", 2, ttl=60)
+        await cache.get("a")  # "b" devient la moins récemment utilisée
+        await cache.set("c", 3, ttl=60)
+        return [await cache.get(key) for key in ("a", "b", "c")], cache._tags
+
+    values, tags = run(scenario())
+    assert values == [1, None, 3]
+    assert tags == {}
+
+
+def test_memory_cache_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+
+    async def scenario():
+        cache = MemoryCache(max_entries=10)
+        await cache.set("a", 1, ttl=30, tags=["recipe:1"])
+        fresh = await cache.get("a")
+        now[0] += 31
+        return fresh, await cache.get("a"), cache._tags
+
+    assert run(scenario()) == (1, None, {})
+
+
+def test_invalidate_recipe_drops_detail_and_tagged_lists():
+    async def scenario():
+        cache = ResponseCache(MemoryCache(max_entries=10), ttl=60)
+        page_1 = await cache.list_key("list", {"limit": 2})
+        page_2 = await cache.list_key("list", {"limit": 2, "skip": 2})
+        await cache.set(cache.detail_key(1), {"id": 1})
+        await cache.set(page_1, ["r1", "r2"], recipe_ids=[1, 2])
+        await cache.set(page_2, ["r3", "r4"], recipe_ids=[3, 4])
+        await cache.invalidate_recipe(1)
+        return [await cache.get(key) for key in (cache.detail_key(1), page_1, page_2)]
+
+    assert run(scenario()) == [None, None, ["r3", "r4"]]
+
+
+def test_invalidate_lists_bumps_generation():
+    async def scenario():
+        cache = ResponseCache(MemoryCache(max_entries=10), ttl=60)
+        before = await cache.list_key("list", {"limit": 20})
+        await cache.set(before, ["r1"], recipe_ids=[1])
+        await cache.invalidate_lists()
+        after = await cache.list_key("list", {"limit": 20})
+        return before, after, await cache.get(after), cache.stats()
+
+    before, after, value, stats = run(scenario())
+    assert before != after
+    assert value is None
+    assert (stats["hits"], stats["misses"]) == (0, 1)
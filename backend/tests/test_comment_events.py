@@ -0,0 +1,179 @@
+"""Diffusion des événements de commentaires, sans base de données.
+
+Files bornées par abonné (débordement : désabonnement), taille des payloads
+NOTIFY, reconnexion de l'écoute LISTEN quelle que soit l'erreur et échec de
+publication sans effet sur la réponse des endpoints.
+"""
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import asyncpg
+import httpx
+import pytest
+from sqlalchemy import exc as sa_exc
+
+from app.api.deps import get_async_db_dep, get_current_user
+from app.main import app
+from app.models.comment import Comment
+from app.models.recipe import Recipe
+from app.services import comment_events
+from app.services.comment_events import (
+    MAX_NOTIFY_BYTES,
+    CommentEventBroker,
+    PostgresCommentEventBroker,
+    notify_payload,
+)
+from app.services.principal_cache import Principal
+
+
+def event(comment_id: int, recipe_id: int = 1, content: str = "Bravo") -> dict:
+    return {"type": "comment_created", "recipe_id": recipe_id, "comment": {"id": comment_id, "content": content}}
+
+
+def test_dispatch_only_to_recipe_subscribers():
+    async def scenario():
+        broker = CommentEventBroker(queue_size=10)
+        with broker.subscribe(1) as on_recipe, broker.subscribe(2) as other:
+            await broker.publish(event(1, recipe_id=1))
+            return await on_recipe.get(0.1), await other.get(0.01)
+
+    received, other = asyncio.run(scenario())
+    assert received["comment"]["id"] == 1
+    assert other is None
+
+
+def test_slow_subscriber_overflows_and_is_unsubscribed():
+    async def scenario():
+        broker = CommentEventBroker(queue_size=3)
+        with broker.subscribe(1) as fast, broker.subscribe(1) as slow:
+            for comment_id in range(5):
+                await broker.publish(event(comment_id))
+                await fast.get(0.1)
+            with pytest.raises(OverflowError):
+                await slow.get(0.1)
+            stats = broker.stats()
+            return fast.overflowed, slow.queue.qsize(), stats
+
+    fast_overflowed, slow_queued, stats = asyncio.run(scenario())
+    assert not fast_overflowed
+    # File vidée : la mémoire du client lent est libérée
+    assert slow_queued == 0
+    assert (stats["subscribers"], stats["dropped"], stats["published"]) == (1, 1, 5)
+
+
+def test_unsubscribe_on_exit_removes_empty_recipe():
+    broker = CommentEventBroker(queue_size=3)
+    with broker.subscribe(1):
+        assert broker.stats()["recipes"] == 1
+    assert broker.stats() == {"broker": "memory", "subscribers": 0, "recipes": 0, "published": 0, "dropped": 0}
+
+
+def test_notify_payload_truncates_large_events():
+    small = event(7)
+    assert json.loads(notify_payload(small)) == small
+
+    large = event(7, content="é" * MAX_NOTIFY_BYTES)
+    payload = notify_payload(large)
+    assert len(payload.encode()) <= MAX_NOTIFY_BYTES
+    assert json.loads(payload) == {"type": "comment_created", "recipe_id": 1, "comment": {"id": 7}}
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    async def add_listener(self, channel, callback):
+        pass
+
+    def is_closed(self):
+        return self.closed
+
+    def terminate(self):
+        self.closed = True
+
+
+def test_listener_reconnects_after_any_error(monkeypatch):
+    errors = [asyncpg.InterfaceError("connection closed"), asyncpg.exceptions.InternalClientError("bug"), OSError("refused")]
+    attempts = []
+
+    async def connect(dsn):
+        attempts.append(dsn)
+        if errors:
+            raise errors.pop(0)
+        return FakeConnection()
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+
+    async def scenario():
+        broker = PostgresCommentEventBroker(queue_size=3, database_url="postgresql+psycopg2://u@localhost/db")
+        broker.RETRY_SECONDS = 0
+        await broker.start()
+        for _ in range(100):
+            if broker.connected:
+                break
+            await asyncio.sleep(0.01)
+        connected = broker.connected
+        await broker.stop()
+        return connected
+
+    assert asyncio.run(scenario())
+    assert len(attempts) == 4
+
+
+class FakeSession:
+    """Session minimale pour les endpoints d'écriture des commentaires"""
+
+    def __init__(self):
+        self.objects = {(Recipe, 1): Recipe(id=1, owner_id=1)}
+        self.commits = 0
+
+    async def get(self, model, item_id):
+        return self.objects.get((model, item_id))
+
+    def add(self, obj):
+        obj.id = 10
+        obj.created_at = obj.updated_at = datetime.now(timezone.utc)
+        self.objects[(type(obj), obj.id)] = obj
+
+    async def delete(self, obj):
+        self.objects.pop((type(obj), obj.id))
+
+    async def flush(self):
+        pass
+
+    async def execute(self, statement):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+
+    async def refresh(self, obj):
+        pass
+
+
+class PoolExhaustedBroker(CommentEventBroker):
+    async def publish(self, event):
+        raise sa_exc.TimeoutError("QueuePool limit reached")
+
+
+def test_publish_failure_after_commit_is_not_a_server_error(monkeypatch):
+    db = FakeSession()
+    author = Principal(
+        id=1, username="user1", email="user1@example.com", bio=None, profile_picture=None,
+        created_at=datetime.now(timezone.utc),
+    )
+    monkeypatch.setattr(comment_events, "comment_broker", PoolExhaustedBroker(queue_size=3))
+    monkeypatch.setitem(app.dependency_overrides, get_async_db_dep, lambda: db)
+    monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: author)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            created = await client.post("/api/v1/recipes/1/comments", json={"content": "Bravo", "recipe_id": 1})
+            updated = await client.put("/api/v1/comments/10", json={"content": "Super"})
+            deleted = await client.delete("/api/v1/comments/10")
+            return created.status_code, updated.status_code, deleted.status_code
+
+    assert asyncio.run(scenario()) == (201, 200, 204)
+    assert db.commits == 3
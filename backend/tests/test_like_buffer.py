@@ -0,0 +1,169 @@
+"""Tampon d'écriture différée des likes, sans base de données.
+
+Une écriture en échec passager doit remettre le lot en attente ; une erreur
+permanente ne doit abandonner que les couples en cause. take() doit attendre la
+fin de l'écriture du lot qui contient son couple.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError, TimeoutError as PoolTimeoutError
+
+from app.services import like_buffer as like_buffer_module
+from app.services.like_buffer import LikeBuffer
+
+
+class FailingSession:
+    def __init__(self, exc: Exception):
+        self.exc = exc
+
+    async def __aenter__(self):
+        raise self.exc
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class BlockingSession:
+    """Session dont la première requête attend `release`, puis échoue"""
+
+    def __init__(self, started: asyncio.Event, release: asyncio.Event):
+        self.started = started
+        self.release = release
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, *args, **kwargs):
+        self.started.set()
+        await self.release.wait()
+        raise OSError("connection lost")
+
+
+class DeadlockDetected(Exception):
+    """Erreur asyncpg traduite : générique, seul le SQLSTATE la qualifie"""
+
+    sqlstate = "40P01"
+
+
+TRANSIENT = [
+    PoolTimeoutError("pool exhausted"),
+    OSError("refused"),
+    OperationalError("INSERT", {}, Exception("server closed the connection")),
+    DBAPIError("INSERT", {}, DeadlockDetected("deadlock detected")),
+]
+
+
+@pytest.mark.parametrize("exc", TRANSIENT)
+def test_transient_failure_requeues_batch(monkeypatch, exc):
+    monkeypatch.setattr(like_buffer_module, "AsyncSessionLocal", lambda: FailingSession(exc))
+
+    async def scenario():
+        buffer = LikeBuffer(interval_ms=200, max_events=1000)
+        buffer.record(1, 10, True)
+        buffer.record(2, 10, False)
+        await buffer.flush()
+        return buffer
+
+    buffer = asyncio.run(scenario())
+    assert buffer._pending == {(1, 10): True, (2, 10): False}
+    assert buffer._flushing == {}
+    assert buffer.failures == 1
+    assert buffer.flushed == 0
+
+
+def test_newer_state_wins_over_requeued_batch(monkeypatch):
+    async def scenario():
+        started, release = asyncio.Event(), asyncio.Event()
+        monkeypatch.setattr(like_buffer_module, "AsyncSessionLocal", lambda: BlockingSession(started, release))
+        buffer = LikeBuffer(interval_ms=200, max_events=1000)
+        buffer.record(1, 10, True)
+        flush = asyncio.create_task(buffer.flush())
+        await started.wait()
+        # Pendant l'écriture : visible des lectures, puis remplacé par un unlike
+        assert buffer.pending_state(1, 10) is True
+        buffer.record(1, 10, False)
+        release.set()
+        await flush
+        return buffer
+
+    buffer = asyncio.run(scenario())
+    assert buffer._pending == {(1, 10): False}
+
+
+def test_take_waits_for_in_flight_flush(monkeypatch):
+    async def scenario():
+        started, release = asyncio.Event(), asyncio.Event()
+        monkeypatch.setattr(like_buffer_module, "AsyncSessionLocal", lambda: BlockingSession(started, release))
+        buffer = LikeBuffer(interval_ms=200, max_events=1000)
+        buffer.record(1, 10, True)
+        flush = asyncio.create_task(buffer.flush())
+        await started.wait()
+        take = asyncio.create_task(buffer.take(1, 10))
+        await asyncio.sleep(0.01)
+        assert not take.done()
+        release.set()
+        await flush
+        return buffer, await take
+
+    buffer, taken = asyncio.run(scenario())
+    # Écriture en échec : l'état remis en attente est rendu à l'appelant
+    assert taken is True
+    assert buffer._pending == {}
+
+
+class RecordingSession:
+    """Écritures validées ; tout lot contenant l'utilisateur 99 (supprimé) est rejeté"""
+
+    committed: list[tuple[int, int]] = []
+
+    def __init__(self):
+        self.pairs: list[tuple[int, int]] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params):
+        pairs = list(zip(params["user_ids"], params["recipe_ids"]))
+        if any(user_id == 99 for user_id, _ in pairs):
+            raise IntegrityError("INSERT", params, Exception("violates foreign key constraint"))
+        self.pairs += pairs
+        return FakeResult({recipe_id for _, recipe_id in pairs})
+
+    async def commit(self):
+        RecordingSession.committed += self.pairs
+
+
+class FakeResult:
+    def __init__(self, recipe_ids):
+        self.recipe_ids = recipe_ids
+
+    def scalars(self):
+        return self.recipe_ids
+
+
+def test_permanent_error_drops_only_failing_pair(monkeypatch):
+    RecordingSession.committed = []
+    monkeypatch.setattr(like_buffer_module, "AsyncSessionLocal", RecordingSession)
+
+    async def scenario():
+        buffer = LikeBuffer(interval_ms=200, max_events=1000)
+        buffer.record(1, 10, True)
+        buffer.record(99, 10, True)
+        buffer.record(2, 11, False)
+        await buffer.flush()
+        # Le lot suivant n'est pas bloqué
+        buffer.record(3, 12, True)
+        await buffer.flush()
+        return buffer
+
+    buffer = asyncio.run(scenario())
+    assert sorted(RecordingSession.committed) == [(1, 10), (2, 11), (3, 12)]
+    assert buffer._pending == {}
+    assert (buffer.flushed, buffer.dropped, buffer.failures) == (3, 1, 0)
@@ -0,0 +1,129 @@
+"""Concurrence sur PUT / DELETE /recipes/{id}/like.
+
+Des requêtes concurrentes sur le même couple (utilisateur, recette) ne doivent
+ni échouer (IntegrityError sur unique_user_recipe_like) ni désynchroniser
+recipes.likes_count du nombre réel de likes. Le recalcul des compteurs
+(reconcile_recipe_counts) ne doit pas écraser un like validé pendant son exécution.
+
+Nécessite une base PostgreSQL dédiée (données de test insérées) :
+
+    LIKE_CONCURRENCY_TESTS=1 DATABASE_URL=postgresql+psycopg2://.../recette_plans pytest tests/test_like_concurrency.py
+"""
+import asyncio
+import os
+import random
+import threading
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    not os.getenv("LIKE_CONCURRENCY_TESTS"),
+    reason="LIKE_CONCURRENCY_TESTS non défini (nécessite une base PostgreSQL dédiée)",
+)
+
+import httpx  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.core.security import create_access_token  # noqa: E402
+from app.db.session import SessionLocal, async_engine, engine  # noqa: E402
+from app.main import app, run_database_migrations  # noqa: E402
+from app.services.recipe_counters import reconcile_recipe_counts  # noqa: E402
+
+CONCURRENT_REQUESTS = 200
+
+
+def create_user_and_recipe() -> tuple[int, int]:
+    suffix = random.randint(0, 10**9)
+    with engine.begin() as conn:
+        user_id = conn.execute(text(
+            "INSERT INTO users (username, email, hashed_password, created_at) "
+            "VALUES (:name, :name || '@example.com', 'x', now()) RETURNING id"
+        ), {"name": f"like_race_{suffix}"}).scalar()
+        recipe_id = conn.execute(text(
+            "INSERT INTO recipes (title, description, ingredients, steps, images, tags, category, "
+            "difficulty, owner_id, created_at, updated_at) "
+            "VALUES ('Recette concurrente', 'Recette pour le test de concurrence des likes', "
+            "'[]', '[]', '[]', '{}', 'plat', 'facile', :user_id, now(), now()) RETURNING id"
+        ), {"user_id": user_id}).scalar()
+    return user_id, recipe_id
+
+
+def like_state(user_id: int, recipe_id: int) -> tuple[int, int, int]:
+    """(likes du couple, likes de la recette, recipes.likes_count)"""
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT (SELECT count(*) FROM likes WHERE user_id = :u AND recipe_id = :r), "
+            "(SELECT count(*) FROM likes WHERE recipe_id = :r), "
+            "(SELECT likes_count FROM recipes WHERE id = :r)"
+        ), {"u": user_id, "r": recipe_id}).one()
+
+
+@pytest.fixture(scope="module")
+def like_pair():
+    run_database_migrations()
+    return create_user_and_recipe()
+
+
+async def hammer(user_id: int, recipe_id: int):
+    headers = {"Authorization": f"Bearer {create_access_token(subject='', user_id=user_id)}"}
+    path = f"/api/v1/recipes/{recipe_id}/like"
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=headers) as client:
+            async def call(method: str) -> tuple[str, int]:
+                return method, (await client.request(method, path)).status_code
+
+            methods = [random.choice(["PUT", "DELETE"]) for _ in range(CONCURRENT_REQUESTS)]
+            results = await asyncio.gather(*(call(m) for m in methods))
+            after_burst = like_state(user_id, recipe_id)
+            # État final déterministe : PUT répété puis DELETE répété
+            results += [await call("PUT"), await call("PUT")]
+            final_like = like_state(user_id, recipe_id)
+            results += [await call("DELETE"), await call("DELETE")]
+            missing = await client.put("/api/v1/recipes/0/like")
+            results.append(("PUT missing", missing.status_code))
+        return results, after_burst, final_like
+    finally:
+        await async_engine.dispose()
+
+
+def test_concurrent_like_unlike_same_pair(like_pair):
+    user_id, recipe_id = like_pair
+    results, (pair_likes, recipe_likes, likes_count), final_like = asyncio.run(hammer(user_id, recipe_id))
+
+    *requests, missing = results
+    assert missing == ("PUT missing", 404)
+    errors = [(method, code) for method, code in requests if code != 204]
+    assert not errors, f"réponses inattendues : {errors[:10]}"
+    assert pair_likes in (0, 1)
+    assert likes_count == recipe_likes == pair_likes
+    assert final_like == (1, 1, 1)
+    assert like_state(user_id, recipe_id) == (0, 0, 0)
+
+
+def test_reconcile_keeps_like_committed_during_recount():
+    run_database_migrations()
+    user_id, recipe_id = create_user_and_recipe()
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE recipes SET likes_count = 42 WHERE id = :r"), {"r": recipe_id})
+
+    # Like en cours (inséré et compté, non validé) : le recalcul attend son verrou
+    conn = engine.connect()
+    transaction = conn.begin()
+    conn.execute(text("INSERT INTO likes (user_id, recipe_id, created_at) VALUES (:u, :r, now())"),
+                 {"u": user_id, "r": recipe_id})
+    conn.execute(text("UPDATE recipes SET likes_count = likes_count + 1 WHERE id = :r"), {"r": recipe_id})
+
+    def reconcile():
+        with SessionLocal() as db:
+            reconcile_recipe_counts(db)
+
+    worker = threading.Thread(target=reconcile)
+    worker.start()
+    worker.join(timeout=0.5)
+    assert worker.is_alive()
+    transaction.commit()
+    conn.close()
+    worker.join(timeout=30)
+
+    assert like_state(user_id, recipe_id) == (1, 1, 1)
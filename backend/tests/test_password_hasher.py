@@ -0,0 +1,27 @@
+"""Pool de hachage bcrypt : reconstruction après la mort d'un processus."""
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.core.security import verify_password
+from app.services.password_hasher import PasswordHasher
+
+
+def test_broken_pool_is_restarted():
+    async def scenario():
+        hasher = PasswordHasher(workers=1, queue_size=2)
+        try:
+            # Le processus meurt (comme un OOM kill), y compris au nouvel essai
+            with pytest.raises(BrokenProcessPool):
+                await hasher._run(os._exit, 1)
+            # Les appels suivants utilisent un pool neuf
+            hashed = await hasher.hash("secret")
+            return hashed, hasher.stats()
+        finally:
+            hasher.shutdown()
+
+    hashed, stats = asyncio.run(scenario())
+    assert verify_password("secret", hashed)
+    assert (stats["restarts"], stats["pending"]) == (2, 0)
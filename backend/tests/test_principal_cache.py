@@ -0,0 +1,130 @@
+"""Cache des utilisateurs authentifiés et get_current_user, sans base de données."""
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.api import deps
+from app.core.security import create_access_token
+from app.models.user import User
+from app.services import principal_cache as principal_cache_module
+from app.services.principal_cache import Principal, PrincipalCache
+
+CREATED_AT = datetime(2024, 1, 15, tzinfo=timezone.utc)
+
+
+def principal(user_id: int, email: str | None = None) -> Principal:
+    return Principal(
+        id=user_id, username=f"user{user_id}", email=email or f"user{user_id}@example.com",
+        bio=None, profile_picture=None, created_at=CREATED_AT,
+    )
+
+
+def test_lru_eviction():
+    cache = PrincipalCache(max_entries=2, ttl=60)
+    cache.set("id:1", principal(1))
+    cache.set("id:2", principal(2))
+    cache.get("id:1")  # "id:2" devient la moins récemment utilisée
+    cache.set("id:3", principal(3))
+    assert [cache.get(k) is not None for k in ("id:1", "id:2", "id:3")] == [True, False, True]
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(principal_cache_module.time, "monotonic", lambda: now[0])
+    cache = PrincipalCache(max_entries=10, ttl=60)
+    cache.set("id:1", principal(1))
+    now[0] += 59
+    assert cache.get("id:1") == principal(1)
+    now[0] += 2
+    assert cache.get("id:1") is None
+
+
+def test_zero_ttl_disables_cache():
+    cache = PrincipalCache(max_entries=10, ttl=0)
+    cache.set("id:1", principal(1))
+    assert cache.get("id:1") is None
+
+
+def test_invalidate_user_drops_id_and_email_keys():
+    cache = PrincipalCache(max_entries=10, ttl=60)
+    cache.set(cache.key(1, None), principal(1))
+    cache.set(cache.key(None, "user1@example.com"), principal(1))
+    cache.set(cache.key(2, None), principal(2))
+    cache.invalidate_user(1)
+    assert cache.get("id:1") is None
+    assert cache.get("email:user1@example.com") is None
+    assert cache.get("id:2") == principal(2)
+
+
+class FakeResult:
+    def __init__(self, user):
+        self.user = user
+
+    def scalars(self):
+        return self
+
+    def first(self):
+        return self.user
+
+
+class FakeSession:
+    """Session minimale : compte les lectures par clé primaire et par email"""
+
+    def __init__(self, users: list[User]):
+        self.users = users
+        self.calls: list[str] = []
+
+    async def get(self, model, user_id):
+        self.calls.append("get")
+        return next((u for u in self.users if u.id == user_id), None)
+
+    async def execute(self, query):
+        self.calls.append("email")
+        email = query.whereclause.right.value
+        return FakeResult(next((u for u in self.users if u.email == email), None))
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = PrincipalCache(max_entries=10, ttl=60)
+    monkeypatch.setattr(deps, "principal_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def db():
+    user = User(id=1, username="user1", email="user1@example.com", hashed_password="x", created_at=CREATED_AT)
+    return FakeSession([user])
+
+
+def current_user(db: FakeSession, token: str) -> Principal:
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    return asyncio.run(deps.get_current_user(creds=creds, db=db))
+
+
+def test_uid_token_uses_primary_key_then_cache(cache, db):
+    token = create_access_token(subject="user1@example.com", user_id=1)
+    assert current_user(db, token) == principal(1)
+    assert current_user(db, token) == principal(1)
+    assert db.calls == ["get"]
+    assert cache.get("id:1") == principal(1)
+
+
+def test_legacy_token_without_uid_falls_back_to_email(cache, db):
+    token = create_access_token(subject="user1@example.com")
+    assert current_user(db, token) == principal(1)
+    assert current_user(db, token) == principal(1)
+    assert db.calls == ["email"]
+    assert cache.get("email:user1@example.com") == principal(1)
+
+
+def test_unknown_user_and_invalid_token_are_rejected(cache, db):
+    with pytest.raises(HTTPException) as missing:
+        current_user(db, create_access_token(subject="", user_id=42))
+    with pytest.raises(HTTPException) as invalid:
+        current_user(db, "not-a-token")
+    assert (missing.value.status_code, invalid.value.status_code) == (401, 401)
+    assert cache.get("id:42") is None
@@ -0,0 +1,232 @@
+"""Régression des plans de requêtes des endpoints.
+
+Chaque endpoint est appelé sur un volume de données réaliste ; le SQL émis est
+capturé puis rejoué avec EXPLAIN (ANALYZE, BUFFERS). Le test échoue sur un
+Seq Scan d'une table de l'application ou sur un nœud de scan qui lit plus de
+MAX_SCANNED_ROWS lignes (index manquant ou inutilisable).
+
+Ces tests peuplent la base : ils ne s'exécutent que sur une base dédiée.
+
+    QUERY_PLAN_TESTS=1 DATABASE_URL=postgresql+psycopg2://.../recette_plans pytest tests/test_query_plans.py
+"""
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    not os.getenv("QUERY_PLAN_TESTS"),
+    reason="QUERY_PLAN_TESTS non défini (nécessite une base PostgreSQL dédiée)",
+)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+from sqlalchemy.engine import make_url  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.pagination import encode_cursor  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db.session import SessionLocal, async_engine, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.cache import NullCache, response_cache  # noqa: E402
+from app.services.principal_cache import principal_cache  # noqa: E402
+from app.services.trending import update_trending_scores  # noqa: E402
+
+SEED_USERS = 2_000
+SEED_RECIPES = 20_000
+SEED_LIKES = 100_000
+SEED_COMMENTS = 50_000
+# Recette « populaire » : beaucoup de likes et de commentaires
+HOT_RECIPE_ID = 1
+MAX_SCANNED_ROWS = 5_000
+APP_TABLES = {"users", "recipes", "likes", "comments", "recipe_ingredients"}
+
+SEED_SQL = [
+    f"""
+    INSERT INTO users (username, email, hashed_password, created_at)
+    SELECT 'plan_user_' || g, 'plan_user_' || g || '@example.com', 'x', now()
+    FROM generate_series(1, {SEED_USERS}) g
+    """,
+    f"""
+    INSERT INTO recipes (title, description, ingredients, steps, images, tags, category,
+                         difficulty, owner_id, created_at, updated_at)
+    SELECT
+        (ARRAY['Tarte', 'Gratin', 'Soupe', 'Salade', 'Curry', 'Risotto', 'Quiche', 'Crumble'])[g % 8 + 1]
+            || ' numero ' || g,
+        'Description de la recette numero ' || g || ' pour le test des plans',
+        jsonb_build_array(
+            jsonb_build_object('name', 'Ingredient ' || (g % 500), 'quantity', '1', 'unit', 'g'),
+            jsonb_build_object('name', 'Ingredient ' || ((g * 7) % 500), 'quantity', '2', 'unit', 'g')
+        ),
+        '["Etape 1", "Etape 2"]'::jsonb,
+        jsonb_build_array('img' || g || '.jpg'),
+        ARRAY['tag' || (g % 200), 'tag' || (g % 13)],
+        (ARRAY['entrée', 'plat', 'dessert', 'boisson'])[g % 4 + 1],
+        (ARRAY['facile', 'moyen', 'difficile'])[g % 3 + 1],
+        (SELECT min(id) FROM users) + g % {SEED_USERS},
+        now() - g * interval '1 minute',
+        now() - g * interval '1 minute'
+    FROM generate_series(1, {SEED_RECIPES}) g
+    """,
+    f"""
+    INSERT INTO likes (user_id, recipe_id, created_at)
+    SELECT (SELECT min(id) FROM users) + g % {SEED_USERS},
+           CASE WHEN g % 50 = 0 THEN {HOT_RECIPE_ID} ELSE (g * 7919) % {SEED_RECIPES} + 1 END,
+           now() - g * interval '1 second'
+    FROM generate_series(1, {SEED_LIKES}) g
+    ON CONFLICT DO NOTHING
+    """,
+    f"""
+    INSERT INTO comments (user_id, recipe_id, content, created_at, updated_at)
+    SELECT (SELECT min(id) FROM users) + g % {SEED_USERS},
+           CASE WHEN g % 100 = 0 THEN {HOT_RECIPE_ID} ELSE (g::bigint * 104729) % {SEED_RECIPES} + 1 END,
+           'Commentaire ' || g,
+           now() - g * interval '1 second',
+           now() - g * interval '1 second'
+    FROM generate_series(1, {SEED_COMMENTS}) g
+    """,
+    """
+    INSERT INTO recipe_ingredients (recipe_id, name)
+    SELECT r.id, lower(immutable_unaccent(btrim(elem->>'name')))
+    FROM recipes r, jsonb_array_elements(r.ingredients) AS elem
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    UPDATE recipes SET
+        likes_count = (SELECT count(*) FROM likes WHERE likes.recipe_id = recipes.id),
+        comments_count = (SELECT count(*) FROM comments WHERE comments.recipe_id = recipes.id)
+    """,
+]
+
+# Curseur de pagination au milieu des likes générés (créés sur ~28 h)
+PAST_CURSOR = encode_cursor(datetime.now(timezone.utc) - timedelta(hours=12), 2**31 - 1)
+
+# (nom, chemin, authentifié, Seq Scan autorisé, lignes lues max)
+ENDPOINT_CASES = [
+    ("list", "/api/v1/recipes/?limit=20", False, False, MAX_SCANNED_ROWS),
+    ("list_offset", "/api/v1/recipes/?skip=100&limit=20", False, False, MAX_SCANNED_ROWS),
+    ("list_category", "/api/v1/recipes/?category=dessert&limit=20", False, False, MAX_SCANNED_ROWS),
+    ("list_difficulty", "/api/v1/recipes/?difficulty=moyen&limit=20", False, False, MAX_SCANNED_ROWS),
+    ("list_tag", "/api/v1/recipes/?tag=tag42&limit=20", False, False, MAX_SCANNED_ROWS),
+    ("list_fulltext", "/api/v1/recipes/?search=risotto%20numero%2042&search_mode=fulltext", False, False, MAX_SCANNED_ROWS),
+    # ILIKE '%...%' sur la description : pas d'index possible, parcours attendu
+    ("list_contains", "/api/v1/recipes/?search=numero%2042&limit=20", False, True, None),
+    ("facets_tag", "/api/v1/recipes/facets?tag=tag42", False, False, MAX_SCANNED_ROWS),
+    ("suggest", "/api/v1/recipes/suggest?q=risoto", False, False, MAX_SCANNED_ROWS),
+    ("by_ingredients", "/api/v1/recipes/by-ingredients?ingredients=ingredient%2042", False, False, MAX_SCANNED_ROWS),
+    ("batch", "/api/v1/recipes/batch?ids=1,2,3,4,5", False, False, MAX_SCANNED_ROWS),
+    ("trending", "/api/v1/recipes/trending?limit=20", False, False, MAX_SCANNED_ROWS),
+    ("detail", f"/api/v1/recipes/{HOT_RECIPE_ID}", False, False, MAX_SCANNED_ROWS),
+    ("comments", f"/api/v1/recipes/{HOT_RECIPE_ID}/comments?limit=50", False, False, MAX_SCANNED_ROWS),
+    ("likes", f"/api/v1/recipes/{HOT_RECIPE_ID}/likes?limit=50", False, False, MAX_SCANNED_ROWS),
+    ("likes_cursor", f"/api/v1/recipes/{HOT_RECIPE_ID}/likes?limit=50&cursor={PAST_CURSOR}", False, False, MAX_SCANNED_ROWS),
+    ("user_likes", "/api/v1/users/2/likes?limit=20", False, False, MAX_SCANNED_ROWS),
+    ("user_likes_cursor", f"/api/v1/users/2/likes?limit=20&cursor={PAST_CURSOR}", False, False, MAX_SCANNED_ROWS),
+    ("likes_count", f"/api/v1/recipes/{HOT_RECIPE_ID}/likes/count", False, False, MAX_SCANNED_ROWS),
+    ("likes_me", f"/api/v1/recipes/{HOT_RECIPE_ID}/likes/me", True, False, MAX_SCANNED_ROWS),
+    ("likes_me_bulk", "/api/v1/recipes/likes/me?ids=" + ",".join(map(str, range(1, 21))), True, False, MAX_SCANNED_ROWS),
+    ("me", "/api/v1/auth/me", True, False, MAX_SCANNED_ROWS),
+    ("public_profile", "/api/v1/auth/users/2", False, False, MAX_SCANNED_ROWS),
+]
+
+
+def seed_database() -> None:
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT count(*) FROM recipes")).scalar() >= SEED_RECIPES:
+            return
+        for statement in SEED_SQL:
+            conn.execute(text(statement))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+
+
+async def explain_statements(statements: list[tuple[str, tuple]]) -> list[tuple[str, dict]]:
+    import asyncpg
+
+    dsn = make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+    conn = await asyncpg.connect(dsn)
+    try:
+        plans = []
+        for statement, parameters in statements:
+            raw = await conn.fetchval(
+                "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, *(parameters or ())
+            )
+            plans.append((statement, json.loads(raw)[0]["Plan"]))
+        return plans
+    finally:
+        await conn.close()
+
+
+def plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def plan_violations(plan: dict, allow_seq_scan: bool, max_rows: int | None) -> list[str]:
+    violations = []
+    for node in plan_nodes(plan):
+        relation = node.get("Relation Name")
+        if relation not in APP_TABLES:
+            continue
+        if node["Node Type"] == "Seq Scan" and not allow_seq_scan:
+            violations.append(f"Seq Scan on {relation}")
+        scanned = round(
+            (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * node.get("Actual Loops", 1)
+        )
+        if max_rows is not None and scanned > max_rows:
+            violations.append(
+                f"{node['Node Type']} on {relation} read {scanned} rows "
+                f"(estimated {node['Plan Rows']}, limit {max_rows})"
+            )
+    return violations
+
+
+@pytest.fixture(scope="module")
+def plan_client():
+    response_cache.backend = NullCache()
+    with TestClient(app, raise_server_exceptions=False) as client:
+        seed_database()
+        with SessionLocal() as db:
+            update_trending_scores(db)
+        yield client
+
+
+@pytest.fixture(scope="module")
+def auth_headers():
+    with engine.connect() as conn:
+        user_id, email = conn.execute(text("SELECT id, email FROM users ORDER BY id LIMIT 1")).one()
+    return {"Authorization": f"Bearer {create_access_token(subject=email, user_id=user_id)}"}
+
+
+@pytest.mark.parametrize(
+    "name,path,authenticated,allow_seq_scan,max_rows",
+    ENDPOINT_CASES,
+    ids=[case[0] for case in ENDPOINT_CASES],
+)
+def test_endpoint_query_plans(plan_client, auth_headers, name, path, authenticated, allow_seq_scan, max_rows):
+    captured: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    # Chemin complet de get_current_user (recherche par clé primaire)
+    principal_cache.clear()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = plan_client.get(path, headers=auth_headers if authenticated else None)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+    assert captured, f"{name}: aucune requête capturée"
+
+    report = []
+    for statement, plan in asyncio.run(explain_statements(captured)):
+        violations = plan_violations(plan, allow_seq_scan, max_rows)
+        if violations:
+            report.append("\n".join(violations) + "\n  " + " ".join(statement.split()))
+    assert not report, f"{name}:\n" + "\n".join(report)
+    assert response.status_code == 200, response.text
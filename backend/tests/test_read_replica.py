@@ -0,0 +1,164 @@
+"""Routage des lectures vers le réplica et lecture de ses propres écritures.
+
+Le « réplica » est une seconde base indépendante, migrée par le test : il ne
+reçoit jamais les écritures, ce qui simule un réplica en retard. On vérifie :
+routage des GET publics, cookie read_primary après une écriture (y compris avec
+le cache de réponses actif), repli sur le primaire si le réplica est injoignable.
+
+Nécessite deux bases PostgreSQL dédiées (données de test insérées) :
+
+    READ_REPLICA_TESTS=1 \\
+    DATABASE_URL=postgresql+psycopg2://.../recette_plans \\
+    DATABASE_REPLICA_URL=postgresql+psycopg2://.../recette_replica \\
+    pytest tests/test_read_replica.py
+"""
+import asyncio
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    not (os.getenv("READ_REPLICA_TESTS") and os.getenv("DATABASE_REPLICA_URL")),
+    reason="READ_REPLICA_TESTS / DATABASE_REPLICA_URL non définis (nécessite deux bases PostgreSQL dédiées)",
+)
+
+import httpx  # noqa: E402
+from sqlalchemy import create_engine, event, text  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db import session as db_session  # noqa: E402
+from app.db.session import PRIMARY_READS_COOKIE, async_engine, engine, replica_engine, replica_health  # noqa: E402
+from app.main import app, run_database_migrations  # noqa: E402
+from app.services.cache import response_cache  # noqa: E402
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def migrate_replica() -> None:
+    env = {**os.environ, "DATABASE_URL": settings.DATABASE_REPLICA_URL}
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR, env=env, check=True, capture_output=True,
+    )
+
+
+INSERT_USER = text(
+    "INSERT INTO users (id, username, email, hashed_password, created_at) "
+    "VALUES (:user_id, :name, :name || '@example.com', 'x', now())"
+)
+INSERT_RECIPE = text(
+    "INSERT INTO recipes (id, title, description, ingredients, steps, images, tags, category, "
+    "difficulty, owner_id, created_at, updated_at) "
+    "VALUES (:recipe_id, 'Version initiale', 'Recette pour le test de routage du réplica', "
+    "'[{\"name\": \"Sel\", \"quantity\": \"1\", \"unit\": \"g\"}]', '[\"Saler\"]', '[]', '{}', "
+    "'plat', 'facile', :user_id, now(), now())"
+)
+
+
+def create_user_and_recipe() -> tuple[int, int]:
+    """Mêmes utilisateur et recette (mêmes ids) sur le primaire et le réplica"""
+    with engine.begin() as conn:
+        params = {
+            "name": f"replica_{random.randint(0, 10**9)}",
+            "user_id": conn.execute(text("SELECT nextval('users_id_seq')")).scalar(),
+            "recipe_id": conn.execute(text("SELECT nextval('recipes_id_seq')")).scalar(),
+        }
+    replica = create_engine(settings.DATABASE_REPLICA_URL)
+    try:
+        for target in (engine, replica):
+            with target.begin() as conn:
+                conn.execute(INSERT_USER, params)
+                conn.execute(INSERT_RECIPE, params)
+    finally:
+        replica.dispose()
+    return params["user_id"], params["recipe_id"]
+
+
+@pytest.fixture(scope="module")
+def user_and_recipe():
+    run_database_migrations()
+    migrate_replica()
+    return create_user_and_recipe()
+
+
+class EngineLog:
+    """Moteur (primaire / réplica) utilisé par chaque requête SQL"""
+
+    def __init__(self):
+        self.engines: list[str] = []
+        self.listeners = [
+            (async_engine.sync_engine, self._recorder("primary")),
+            (replica_engine.sync_engine, self._recorder("replica")),
+        ]
+
+    def __enter__(self):
+        for target, listener in self.listeners:
+            event.listen(target, "before_cursor_execute", listener)
+        return self
+
+    def __exit__(self, *exc):
+        for target, listener in self.listeners:
+            event.remove(target, "before_cursor_execute", listener)
+
+    def _recorder(self, name):
+        def record(*args):
+            self.engines.append(name)
+        return record
+
+
+async def scenario(user_id: int, recipe_id: int):
+    headers = {"Authorization": f"Bearer {create_access_token(subject='', user_id=user_id)}"}
+    path = f"/api/v1/recipes/{recipe_id}"
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=headers) as writer, \
+                httpx.AsyncClient(transport=transport, base_url="http://test") as reader:
+            # Routage : lecture publique sur le réplica, mise en cache
+            with EngineLog() as log:
+                results["routed"] = ((await reader.get(path)).json()["title"], set(log.engines))
+
+            # Écriture : cookie posé, cache invalidé
+            response = await writer.put(path, json={"title": "Version modifiee"})
+            results["cookie"] = (response.status_code, PRIMARY_READS_COOKIE in writer.cookies)
+
+            # Lecteur non épinglé : réplica en retard, la réponse ne doit pas remplir le cache
+            results["stale_reader"] = (await reader.get(path)).json()["title"]
+            results["cached_after_stale_read"] = await response_cache.backend.get(response_cache.detail_key(recipe_id))
+            # Le client qui a écrit lit sa modification (primaire, cache ignoré)
+            with EngineLog() as log:
+                results["writer"] = ((await writer.get(path)).json()["title"], set(log.engines))
+
+            # Réplica injoignable : repli sur le primaire
+            await response_cache.backend.delete(response_cache.detail_key(recipe_id))
+            unreachable = create_async_engine("postgresql+asyncpg://nobody@127.0.0.1:1/none")
+            original = db_session.ReplicaSessionLocal
+            db_session.ReplicaSessionLocal = async_sessionmaker(unreachable)
+            try:
+                response = await reader.get(path)
+                results["fallback"] = (response.status_code, response.json()["title"], replica_health.available())
+            finally:
+                db_session.ReplicaSessionLocal = original
+                replica_health.down_until = 0.0
+                await unreachable.dispose()
+        return results
+    finally:
+        await async_engine.dispose()
+        await replica_engine.dispose()
+
+
+def test_replica_routing_and_read_your_writes(user_and_recipe):
+    results = asyncio.run(scenario(*user_and_recipe))
+
+    assert results["routed"] == ("Version initiale", {"replica"})
+    assert results["cookie"] == (200, True)
+    assert results["stale_reader"] == "Version initiale"
+    assert results["cached_after_stale_read"] is None
+    assert results["writer"] == ("Version modifiee", {"primary"})
+    assert results["fallback"] == (200, "Version modifiee", False)
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""Script pour intégrer les nouveaux likes / commentaires aux scores de tendance (job périodique)"""
+import os
+import sys
+
+# Ajouter le chemin du backend au PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.session import SessionLocal
+from app.services.trending import update_trending_scores
+
+def main():
+    with SessionLocal() as db:
+        updated = update_trending_scores(db)
+    print(f'✅ Tendances mises à jour: {updated} recette(s)')
+
+if __name__ == "__main__":
+    main()
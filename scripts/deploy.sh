@@ -45,6 +45,8 @@ echo -e "${BLUE}5. Déploiement du Backend...${NC}"
 kubectl apply -f k8s/backend-deployment.yaml
 echo "Attente du backend..."
 kubectl wait --for=condition=ready pod -l app=backend -n recipe-app --timeout=120s
+# Mise à jour périodique des scores de GET /recipes/trending
+kubectl apply -f k8s/trending-cronjob.yaml
 echo -e "${GREEN}✓ Backend déployé et prêt${NC}"
 echo ""
 